@@ -0,0 +1,622 @@
+import os
+import sys
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QPushButton, QCheckBox, QFileDialog, QInputDialog, QLabel, QLineEdit, QMessageBox, QListView, QHBoxLayout, QSizePolicy
+)
+from PyQt6.QtCore import Qt, QModelIndex, QTimer
+from PyQt6.QtGui import QPixmap, QKeySequence, QShortcut
+
+from bundles import get_bundle_cache
+from cli import resolve_preset
+from config_manager import get_config_manager
+from conflicts import analyze_conflicts
+from hashing import find_duplicates, library_files
+from launcher import build_command, validate_launch
+from library import get_library
+from library_page import LibraryPage
+from mod_list_model import FilteredModList, ModListModel
+from prefetch import get_prefetcher
+from preset_catalog import get_catalog
+from preset_grid import PresetGridView, PresetListModel, THUMBNAIL_HEIGHT, THUMBNAIL_WIDTH
+from resident import InstanceServer, make_resident
+from search_index import SearchIndex, build_index
+from shell import WindowShell, load_pixmap
+from supervisor import EngineLogPage, get_supervisor
+from tasks import run_in_background
+from themes import DEFAULT_THEME, get_theme
+from thumbnails import ThumbnailCache
+from tracing import mark, span, traced
+from warmup import StartupSequence
+
+class BaseWindow(QWidget):
+    def __init__(self, shell):
+        super().__init__()
+        self.shell = shell
+        self.config_manager = get_config_manager()
+
+    def launch_gzdoom(self, gzdoom_path, pk3_files, label, bundle=False, response_file=False):
+        mark("launch.requested", label=label)
+        pk3_files = list(pk3_files)
+        run_in_background(
+            validate_launch, gzdoom_path, pk3_files,
+            callback=lambda problems: self.start_gzdoom(gzdoom_path, pk3_files, label, problems, bundle, response_file),
+            error_callback=lambda error: QMessageBox.warning(self, "Error", f"Could not validate the mods: {str(error)}")
+        )
+
+    def start_gzdoom(self, gzdoom_path, pk3_files, label, problems, bundle=False, response_file=False):
+        if problems:
+            QMessageBox.warning(self, "Error", "Could not launch GZDoom:\n" + "\n".join(problems))
+            return
+        if bundle or self.config_manager.config.get("bundled_launch"):
+            run_in_background(
+                get_bundle_cache().launch_files, pk3_files,
+                callback=lambda files: get_supervisor().start(self.engine_command(gzdoom_path, files, response_file), label),
+                error_callback=lambda error: QMessageBox.warning(self, "Error", f"Could not build the launch bundle: {str(error)}")
+            )
+            return
+        get_supervisor().start(self.engine_command(gzdoom_path, pk3_files, response_file), label)
+
+    def engine_command(self, gzdoom_path, pk3_files, response_file=False):
+        return build_command(gzdoom_path, pk3_files, response_file or self.config_manager.config.get("response_file_launch", False))
+
+class SplashScreen(QWidget):
+    def __init__(self, theme):
+        super().__init__()
+        self.theme = theme
+        self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.FramelessWindowHint)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        self.label = QLabel()
+        pixmap = load_pixmap(self.theme, "splash")
+        self.label.setPixmap(pixmap)
+        layout.addWidget(self.label)
+        self.setLayout(layout)
+        self.setFixedSize(pixmap.width(), pixmap.height())
+        self.center_window()
+
+    def center_window(self):
+        screen = self.screen()
+        screen_rect = screen.availableGeometry()
+        self.move(
+            (screen_rect.width() - self.width()) // 2,
+            (screen_rect.height() - self.height()) // 2
+        )
+
+class PresetWindow(BaseWindow):
+    def __init__(self, shell):
+        super().__init__(shell)
+        self.pk3_files = []
+        self.preset_label = ""
+        self.catalog = get_catalog()
+        self.preset_model = PresetListModel(self.catalog, self)
+        self.preset_names = []
+        self.preset_index = SearchIndex()
+        self.preset_index_names = None
+        self.thumbnail_cache = None
+        self.preset_model.thumbnail_loader = self.load_thumbnail
+        self.conflict_summaries = {}
+        self.init_ui()
+        self.load_presets()
+        self.build_preset_index()
+
+    def init_ui(self):
+        self.setWindowTitle("Select Preset")
+        self.setFixedSize(400, 500)
+        layout = self.create_main_layout()
+        self.setLayout(layout)
+
+    def create_main_layout(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(50, 50, 50, 50)
+
+        self.label_presets = QLabel("Select Game")
+        self.label_presets.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label_presets.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Minimum)
+        layout.addWidget(self.label_presets, alignment=Qt.AlignmentFlag.AlignHCenter)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search presets")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.filter_presets)
+        self.search_input.returnPressed.connect(self.run_first_preset)
+        layout.addWidget(self.search_input)
+
+        self.preset_grid = PresetGridView(self.preset_model, tile_art=self.shell.button_art)
+        self.preset_grid.preset_activated.connect(self.run_selected_preset)
+        self.preset_grid.preset_hovered.connect(self.show_preset_conflicts)
+        self.preset_grid.preset_hovered.connect(self.prefetch_preset)
+        self.preset_grid.preset_rename_requested.connect(self.rename_preset)
+        self.preset_grid.preset_delete_requested.connect(self.delete_preset)
+        layout.addWidget(self.preset_grid)
+        layout.addSpacing(20)
+        layout.addLayout(self.create_options_layout())
+        return layout
+
+    def create_options_layout(self):
+        options_layout = QHBoxLayout()
+        
+        self.options_button = QPushButton("Options")
+        self.options_button.setObjectName("optionsButton")  # Set object name for styling
+        self.options_button.clicked.connect(self.show_options)
+
+        self.log_button = QPushButton("Log")
+        self.log_button.clicked.connect(self.show_log)
+        
+        options_layout.addStretch()
+        options_layout.addWidget(self.options_button)
+        options_layout.addWidget(self.log_button)
+        options_layout.addStretch()
+        return options_layout
+
+    def page_shown(self):
+        self.on_presets_changed()
+
+    def on_presets_changed(self):
+        if self.catalog.refresh():
+            self.load_presets()
+
+    @traced("presets.load")
+    def load_presets(self):
+        self.catalog.refresh()
+        self.preset_names = self.catalog.preset_names()
+        self.preset_model.clear_thumbnails()
+        self.filter_presets()
+
+    def preset_index_entries(self, preset_names):
+        return {preset_name: (preset_name, None) for preset_name in preset_names}
+
+    def build_preset_index(self):
+        # The first full build happens off the GUI thread; later catalog
+        # changes are applied incrementally when the next search runs.
+        preset_names = self.preset_names
+        run_in_background(
+            build_index, self.preset_index_entries(preset_names),
+            callback=lambda index: self.preset_index_built(index, preset_names)
+        )
+
+    def preset_index_built(self, index, preset_names):
+        if self.preset_index_names is None:
+            self.preset_index = index
+            self.preset_index_names = preset_names
+
+    def filter_presets(self):
+        query = self.search_input.text()
+        if not query.strip():
+            self.preset_model.reload(self.preset_names)
+            return
+        if self.preset_index_names is not self.preset_names:
+            self.preset_index.sync(self.preset_index_entries(self.preset_names))
+            self.preset_index_names = self.preset_names
+        self.preset_model.reload(self.preset_index.search(query))
+
+    def run_first_preset(self):
+        if self.preset_model.rowCount():
+            self.run_selected_preset(self.preset_model.preset_names[0])
+
+    def load_thumbnail(self, preset_name):
+        try:
+            pk3_files = self.catalog.load(preset_name)
+        except Exception:
+            return
+        if self.thumbnail_cache is None:
+            scale = self.devicePixelRatio()
+            gzdoom_path = self.config_manager.config.get("gzdoom_path", "")
+            self.thumbnail_cache = ThumbnailCache(round(THUMBNAIL_WIDTH * scale), round(THUMBNAIL_HEIGHT * scale), os.path.dirname(gzdoom_path) or None)
+        run_in_background(
+            self.thumbnail_cache.preset_thumbnail, pk3_files,
+            callback=lambda image: self.show_thumbnail(preset_name, image)
+        )
+
+    def show_thumbnail(self, preset_name, image):
+        if image is not None:
+            self.preset_model.set_thumbnail(preset_name, QPixmap.fromImage(image))
+
+    def show_preset_conflicts(self, preset_name):
+        signature = self.catalog.entries.get(preset_name)
+        cached = self.conflict_summaries.get(preset_name)
+        if cached is not None and cached[0] == signature:
+            return
+        try:
+            pk3_files = self.catalog.load(preset_name)
+        except Exception as e:
+            self.set_preset_tooltip(preset_name, signature, f"Could not load the preset: {str(e)}")
+            return
+        self.set_preset_tooltip(preset_name, signature, "Checking for conflicts...")
+        run_in_background(
+            lambda: analyze_conflicts(pk3_files).summary(),
+            callback=lambda summary: self.set_preset_tooltip(preset_name, signature, summary)
+        )
+
+    def prefetch_preset(self, preset_name):
+        # Hovering or selecting a tile is a good hint that it is about to be
+        # launched, so its archives start moving into the page cache.
+        try:
+            pk3_files = self.catalog.load(preset_name)
+        except Exception:
+            return
+        get_prefetcher().prefetch(pk3_files)
+
+    def set_preset_tooltip(self, preset_name, signature, summary):
+        self.conflict_summaries[preset_name] = (signature, summary)
+        self.preset_model.set_tooltip(preset_name, summary)
+
+    def run_selected_preset(self, preset_name):
+        try:
+            with span("preset.run", preset=preset_name):
+                self.pk3_files = self.catalog.load(preset_name)
+                self.preset_label = preset_name
+                self.run_gzdoom()
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not load the preset: {str(e)}")
+
+    def rename_preset(self, preset_name):
+        new_name, accepted = QInputDialog.getText(self, "Rename Preset", "Preset name:", text=preset_name)
+        new_name = new_name.strip()
+        if not accepted or not new_name or new_name == preset_name:
+            return
+        try:
+            self.catalog.rename(preset_name, new_name)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not rename the preset: {str(e)}")
+        self.on_presets_changed()
+
+    def delete_preset(self, preset_name):
+        answer = QMessageBox.question(self, "Delete Preset", f"Delete the preset \"{preset_name}\"?")
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            self.catalog.delete(preset_name)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not delete the preset: {str(e)}")
+        self.on_presets_changed()
+
+    def run_forwarded_preset(self, name, bundle=False, response_file=False):
+        # Presets named by a later launch of the program, such as a desktop
+        # shortcut, are looked up the way the command line looks them up.
+        try:
+            self.pk3_files = resolve_preset(self.catalog, name)
+            self.preset_label = self.catalog.find(name) or name
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not load the preset: {str(e)}")
+            return
+        self.run_gzdoom(bundle, response_file)
+
+    def run_gzdoom(self, bundle=False, response_file=False):
+        if not self.pk3_files:
+            QMessageBox.warning(self, "Error", "No mods in this preset.")
+            return
+        
+        gzdoom_path = self.config_manager.config.get("gzdoom_path", "")
+        if not gzdoom_path:
+            QMessageBox.warning(self, "Error", "GZDoom is not configured.")
+            return
+
+        self.launch_gzdoom(gzdoom_path, self.pk3_files, self.preset_label, bundle, response_file)
+
+    def show_options(self):
+        self.save_position()
+        get_prefetcher().cancel()
+        self.shell.show_page("options")
+
+    def show_log(self):
+        self.save_position()
+        get_prefetcher().cancel()
+        self.shell.show_page("log")
+
+    def save_position(self):
+        self.config_manager.config["preset_window_position"] = (self.shell.x(), self.shell.y())
+        self.config_manager.save_config()
+
+class DoomModSelectorApp(BaseWindow):
+    def __init__(self, shell):
+        super().__init__(shell)
+        self.mod_model = ModListModel(parent=self)
+        self.mod_filter = FilteredModList(self.mod_model, parent=self)
+        self.mod_index = SearchIndex()
+        self.mod_index_version = None
+        self.mod_list_version = 0
+        self.mod_list_update_pending = False
+        self.mod_list_edited = False
+        self.init_ui()
+        self.load_pk3_files()
+
+    def init_ui(self):
+        self.setWindowTitle("Doom Mod Selector")
+        self.setFixedSize(400, 500)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(50, 50, 50, 50)
+
+        self.label = QLabel("Selected PK3 Mods:")
+        layout.addWidget(self.label)
+
+        self.mod_search_input = QLineEdit()
+        self.mod_search_input.setPlaceholderText("Search mods")
+        self.mod_search_input.setClearButtonEnabled(True)
+        self.mod_search_input.textChanged.connect(self.filter_mods)
+        layout.addWidget(self.mod_search_input)
+
+        self.mod_list_view = QListView()
+        self.mod_list_view.setModel(self.mod_filter)
+        self.mod_list_view.setUniformItemSizes(True)
+        self.mod_list_view.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.mod_list_view)
+        self.create_mod_list_shortcuts()
+        for signal in (self.mod_model.rowsInserted, self.mod_model.rowsRemoved, self.mod_model.rowsMoved, self.mod_model.modelReset):
+            signal.connect(self.mod_list_changed)
+        # Edits are written back to config.json; a reset only ever comes
+        # from loading that list, so it is not saved again.
+        for signal in (self.mod_model.rowsInserted, self.mod_model.rowsRemoved, self.mod_model.rowsMoved):
+            signal.connect(self.mark_mod_list_edited)
+
+        add_layout = QHBoxLayout()
+        self.add_button = QPushButton("Add PK3")
+        self.add_button.clicked.connect(self.add_pk3_file)
+        add_layout.addWidget(self.add_button)
+        self.library_button = QPushButton("Library")
+        self.library_button.clicked.connect(self.show_library)
+        add_layout.addWidget(self.library_button)
+        layout.addLayout(add_layout)
+
+        tools_layout = QHBoxLayout()
+        self.conflicts_button = QPushButton("Conflicts")
+        self.conflicts_button.clicked.connect(self.check_conflicts)
+        tools_layout.addWidget(self.conflicts_button)
+        self.duplicates_button = QPushButton("Duplicates")
+        self.duplicates_button.clicked.connect(self.find_duplicates)
+        tools_layout.addWidget(self.duplicates_button)
+        layout.addLayout(tools_layout)
+
+        self.gzdoom_input = QLineEdit("")
+        self.gzdoom_input.setPlaceholderText("Path to GZDoom.exe")
+        layout.addWidget(self.gzdoom_input)
+
+        self.browse_button = QPushButton("Browse GZDoom")
+        self.browse_button.clicked.connect(self.browse_gzdoom_path)
+        layout.addWidget(self.browse_button)
+
+        self.save_preset_button = QPushButton("Save Preset")
+        self.save_preset_button.clicked.connect(self.save_preset)
+        layout.addWidget(self.save_preset_button)
+
+        run_layout = QHBoxLayout()
+        self.run_button = QPushButton("Run GZDoom")
+        self.run_button.clicked.connect(self.run_gzdoom)
+        run_layout.addWidget(self.run_button, 1)
+        self.bundle_checkbox = QCheckBox("Bundle")
+        self.bundle_checkbox.setToolTip("Merge the mods into one cached archive before launching")
+        self.bundle_checkbox.setChecked(bool(self.config_manager.config.get("bundled_launch")))
+        self.bundle_checkbox.toggled.connect(self.set_bundled_launch)
+        run_layout.addWidget(self.bundle_checkbox)
+        layout.addLayout(run_layout)
+
+        self.back_button = QPushButton("Back to Presets")
+        self.back_button.clicked.connect(self.back_to_presets)
+        layout.addWidget(self.back_button)
+
+        self.setLayout(layout)
+
+    @property
+    def pk3_files(self):
+        return self.mod_model.paths()
+
+    def create_mod_list_shortcuts(self):
+        shortcuts = (
+            (QKeySequence.StandardKey.Delete, self.remove_selected_mods),
+            (QKeySequence("Ctrl+Up"), lambda: self.move_selected_mod(-1)),
+            (QKeySequence("Ctrl+Down"), lambda: self.move_selected_mod(1))
+        )
+        for key, handler in shortcuts:
+            shortcut = QShortcut(key, self.mod_list_view)
+            shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+            shortcut.activated.connect(handler)
+
+    def mod_list_changed(self, *args):
+        # An edit such as removing a selection arrives as one signal per
+        # range of rows; they are folded into a single update, run on the
+        # next turn of the event loop.
+        self.mod_list_version += 1
+        if not self.mod_list_update_pending:
+            self.mod_list_update_pending = True
+            QTimer.singleShot(0, self.update_mod_list)
+
+    def mark_mod_list_edited(self, *args):
+        self.mod_list_edited = True
+
+    def update_mod_list(self):
+        if not self.mod_list_update_pending:
+            return
+        self.mod_list_update_pending = False
+        if self.mod_list_edited:
+            self.mod_list_edited = False
+            self.save_pk3_files()
+        self.filter_mods()
+
+    def mod_index_entries(self, paths):
+        return {path: (os.path.basename(path), path) for path in paths}
+
+    def build_mod_index(self):
+        # As with presets, the first full build happens off the GUI thread;
+        # later edits are applied incrementally when the next search runs.
+        version = self.mod_list_version
+        run_in_background(
+            build_index, self.mod_index_entries(self.pk3_files),
+            callback=lambda index: self.mod_index_built(index, version)
+        )
+
+    def mod_index_built(self, index, version):
+        if self.mod_index_version is None or self.mod_index_version < version:
+            self.mod_index = index
+            self.mod_index_version = version
+
+    def filter_mods(self):
+        # The view shows the matching mods in load order through a list of
+        # its own; the mods themselves, and their row numbers, stay as they
+        # are.
+        query = self.mod_search_input.text()
+        if not query.strip():
+            self.mod_filter.set_rows()
+            return
+        if self.mod_index_version != self.mod_list_version:
+            self.mod_index.sync(self.mod_index_entries(self.pk3_files))
+            self.mod_index_version = self.mod_list_version
+        paths, best = self.mod_index.select(query)
+        self.mod_filter.set_rows(self.mod_model.rows(paths))
+        if best is not None:
+            self.mod_list_view.setCurrentIndex(self.mod_view_index(self.mod_model.rows([best])[0]))
+
+    def mod_view_index(self, row):
+        view_row = self.mod_filter.row_of(row)
+        return QModelIndex() if view_row is None else self.mod_filter.index(view_row)
+
+    def remove_selected_mods(self):
+        # Rows picked from a list that an earlier edit has not been applied
+        # to yet would point at the wrong mods.
+        self.update_mod_list()
+        rows = [self.mod_filter.source_row(index.row()) for index in self.mod_list_view.selectionModel().selectedRows()]
+        self.mod_model.remove_rows(rows)
+
+    def move_selected_mod(self, offset):
+        self.update_mod_list()
+        current = self.mod_list_view.currentIndex()
+        if not current.isValid():
+            return
+        row = self.mod_filter.source_row(current.row())
+        if self.mod_model.move_row(row, row + offset):
+            self.update_mod_list()
+            self.mod_list_view.setCurrentIndex(self.mod_view_index(row + offset))
+
+    def add_pk3_file(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Select PK3 Files", "", "Doom Mods (*.pk3 *.pk7 *.ipk3 *.wad *.iwad *.zip);;All Files (*)")
+        
+        if files:
+            self.mod_model.insert_paths(files)
+
+    def check_conflicts(self):
+        if not self.pk3_files:
+            QMessageBox.warning(self, "Error", "No mods selected.")
+            return
+        self.conflicts_button.setEnabled(False)
+        run_in_background(
+            analyze_conflicts, list(self.pk3_files),
+            callback=self.show_conflicts, error_callback=self.conflicts_failed
+        )
+
+    def show_conflicts(self, report):
+        self.conflicts_button.setEnabled(True)
+        QMessageBox.information(self, "Conflicts", report.summary())
+
+    def conflicts_failed(self, error):
+        self.conflicts_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", f"Could not check conflicts: {str(error)}")
+
+    def find_duplicates(self):
+        self.duplicates_button.setEnabled(False)
+        catalog = get_catalog()
+        pk3_files = list(self.pk3_files)
+        run_in_background(
+            lambda: find_duplicates(library_files(catalog, pk3_files)),
+            callback=self.show_duplicates, error_callback=self.duplicates_failed
+        )
+
+    def show_duplicates(self, report):
+        self.duplicates_button.setEnabled(True)
+        QMessageBox.information(self, "Duplicates", report.summary())
+
+    def duplicates_failed(self, error):
+        self.duplicates_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", f"Could not check for duplicates: {str(error)}")
+
+    def browse_gzdoom_path(self):
+        file, _ = QFileDialog.getOpenFileName(self, "Select GZDoom.exe", "", "Executable Files (*.exe);;All Files (*)")
+        if file:
+            self.gzdoom_input.setText(file)
+            self.save_gzdoom_path()
+
+    def save_gzdoom_path(self):
+        self.config_manager.update_gzdoom_path(self.gzdoom_input.text())
+
+    def load_pk3_files(self):
+        self.mod_model.set_paths(self.config_manager.config.get("pk3_files", []))
+        self.build_mod_index()
+
+    def save_pk3_files(self):
+        self.config_manager.config["pk3_files"] = self.mod_model.paths()
+        self.config_manager.save_config()
+
+    def save_preset(self):
+        catalog = get_catalog()
+        preset_name, accepted = QInputDialog.getText(self, "Save Preset", "Preset name:")
+        preset_name = preset_name.strip()
+        if not accepted or not preset_name:
+            return
+        existing = catalog.find(preset_name)
+        if existing is not None:
+            answer = QMessageBox.question(self, "Save Preset", f"Replace the preset \"{existing}\"?")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        try:
+            catalog.save(preset_name, self.pk3_files)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not save the preset: {str(e)}")
+
+    def run_gzdoom(self):
+        if not self.pk3_files:
+            QMessageBox.warning(self, "Error", "No mods selected.")
+            return
+        
+        gzdoom_path = self.config_manager.config.get("gzdoom_path", "")
+        if not gzdoom_path:
+            QMessageBox.warning(self, "Error", "GZDoom is not configured.")
+            return
+
+        self.launch_gzdoom(gzdoom_path, self.pk3_files, "Selected mods")
+
+    def set_bundled_launch(self, enabled):
+        self.config_manager.config["bundled_launch"] = enabled
+        self.config_manager.save_config()
+
+    def show_library(self):
+        self.shell.show_page("library")
+
+    def back_to_presets(self):
+        self.save_position()
+        self.shell.show_page("presets")
+
+    def save_position(self):
+        self.config_manager.config["options_window_position"] = (self.shell.x(), self.shell.y())
+        self.config_manager.save_config()
+
+def create_shell(theme):
+    shell = WindowShell(theme)
+    shell.add_page("presets", PresetWindow)
+    shell.add_page("options", DoomModSelectorApp)
+    shell.add_page("log", lambda shell: EngineLogPage(shell, get_supervisor()))
+    shell.add_page("library", lambda shell: LibraryPage(shell, get_library(), get_config_manager()))
+    get_supervisor().run_failed.connect(lambda run, error: QMessageBox.warning(shell, "Error", f"Could not start GZDoom: {error}"))
+    return shell
+
+def create_window(theme):
+    shell = create_shell(theme)
+    shell.show_page("presets")
+    shell.center_window()
+    return shell
+
+def main(default_theme=DEFAULT_THEME):
+    # Every edition runs this same window; they differ only in the theme
+    # used when config.json does not name one.
+    app = QApplication.instance() or QApplication(sys.argv)
+    server = InstanceServer()
+    server.listen()
+
+    theme = get_theme(default_theme)
+    splash = SplashScreen(theme)
+    splash.show()
+
+    startup = StartupSequence(splash, lambda theme: make_resident(create_window(theme), server), theme)
+    startup.start()
+
+    return app.exec()
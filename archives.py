@@ -0,0 +1,58 @@
+import os
+import threading
+
+from pk3_index import ArchiveError, index_pk3, read_entry
+from wad_reader import WAD_MAGICS, WadFile
+
+ZIP_MAGICS = (b"PK\x03\x04", b"PK\x05\x06")
+MOD_EXTENSIONS = (".pk3", ".pk7", ".ipk3", ".wad", ".iwad", ".zip")
+
+_wad_directories = {}
+_wad_directories_lock = threading.Lock()
+
+
+def archive_kind(path):
+    with open(path, 'rb') as file:
+        magic = file.read(4)
+    if magic in ZIP_MAGICS:
+        return "pk3"
+    if magic in WAD_MAGICS:
+        return "wad"
+    return None
+
+
+def index_wad(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _wad_directories_lock:
+        cached = _wad_directories.get(path)
+    if cached is not None and (cached.size, cached.mtime_ns) == key:
+        return cached
+    with WadFile(path) as wad:
+        directory = wad.snapshot()
+    with _wad_directories_lock:
+        _wad_directories[path] = directory
+    return directory
+
+
+def index_archive(path):
+    kind = archive_kind(path)
+    if kind == "pk3":
+        return index_pk3(path)
+    if kind == "wad":
+        return index_wad(path)
+    raise ArchiveError(f"{path} is not a pk3 or WAD archive")
+
+
+def read_archive_entry(index, entry):
+    if index.kind == "pk3":
+        return read_entry(index, entry)
+    with WadFile(index.path) as wad:
+        if (wad.size, wad.mtime_ns) != (index.size, index.mtime_ns):
+            raise ArchiveError(f"{index.path} changed since it was indexed")
+        lump = wad.lump(entry)
+        try:
+            return lump.tobytes()
+        finally:
+            lump.release()
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["main", "full", "MOOD_SELECTOR_Clasic_Edition"]
+PRESET_COUNTS = [10, 100, 1000]
+TIMEOUT = 60
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_child(module_name):
+    # Runs inside the synthetic preset folder: measures one cold start of an
+    # entry point and prints the numbers as a single JSON line.
+    sys.path.insert(0, REPO_DIR)
+    started = time.perf_counter()
+    module = __import__(module_name)
+    imported = time.perf_counter()
+    # Every entry point runs the window defined in app.py.
+    window_class = sys.modules["app"].PresetWindow
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+    app = QApplication(sys.argv[:1])
+    app_created = time.perf_counter()
+    result = {}
+
+    def preset_window_visible():
+        for widget in app.topLevelWidgets():
+            if not widget.isVisible():
+                continue
+            if isinstance(widget, window_class) or any(page.isVisible() for page in widget.findChildren(window_class)):
+                return True
+        return False
+
+    def poll():
+        if preset_window_visible():
+            result["visible"] = time.perf_counter()
+            app.quit()
+        elif time.perf_counter() - app_created > TIMEOUT:
+            app.quit()
+        else:
+            QTimer.singleShot(1, poll)
+
+    QTimer.singleShot(0, poll)
+    module.main()
+
+    print(json.dumps({
+        "import_s": imported - started,
+        "qapplication_s": app_created - imported,
+        "splash_to_visible_s": result["visible"] - app_created if "visible" in result else None,
+        "peak_rss_kb": peak_rss_kb()
+    }))
+    return 0
+
+
+def create_workspace(preset_count):
+    # Themes are found next to the code, so the workspace only holds presets.
+    workspace = tempfile.mkdtemp(prefix="mood-bench-")
+    for index in range(preset_count):
+        with open(os.path.join(workspace, f"preset_{index:05d}.json"), 'w') as preset_file:
+            json.dump([f"/mods/mod_{index}_{n}.pk3" for n in range(5)], preset_file)
+    return workspace
+
+
+def measure(module_name, preset_count, runs, min_splash_ms):
+    workspace = create_workspace(preset_count)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", MOOD_SPLASH_MIN_MS=str(min_splash_ms))
+    samples = []
+    try:
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", module_name],
+                cwd=workspace, env=env, capture_output=True, text=True, timeout=TIMEOUT * 2
+            )
+            lines = output.stdout.strip().splitlines()
+            if output.returncode != 0 or not lines:
+                raise RuntimeError(f"{module_name} failed with {output.returncode}:\n{output.stderr}")
+            samples.append(json.loads(lines[-1]))
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    summary = {"entry_point": module_name, "presets": preset_count, "runs": runs}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        summary[key] = statistics.median(values) if values else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-interactive of the MOOD SELECTOR entry points.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--entry-points", nargs="+", default=ENTRY_POINTS)
+    parser.add_argument("--presets", nargs="+", type=int, default=PRESET_COUNTS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--min-splash-ms", type=int, default=0)
+    parser.add_argument("--output", default="bench_startup.json")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child)
+
+    results = []
+    for module_name in args.entry_points:
+        for preset_count in args.presets:
+            summary = measure(module_name, preset_count, args.runs, args.min_splash_ms)
+            results.append(summary)
+            print(f"{module_name:32} {preset_count:6} presets  "
+                  f"import {summary['import_s'] * 1000:7.1f} ms  "
+                  f"app {summary['qapplication_s'] * 1000:7.1f} ms  "
+                  f"visible {(summary['splash_to_visible_s'] or 0) * 1000:8.1f} ms  "
+                  f"rss {summary['peak_rss_kb'] or 0:8} KB")
+
+    with open(args.output, 'w') as file:
+        json.dump({"python": sys.version.split()[0], "platform": sys.platform, "results": results}, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
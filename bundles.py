@@ -0,0 +1,279 @@
+import os
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+
+from conflicts import MERGED_LUMPS, NAMESPACES, pk3_resource_key, short_name
+from pk3_index import (
+    ArchiveError, CENTRAL_DIRECTORY_ENTRY, END_OF_CENTRAL_DIRECTORY, LOCAL_FILE_HEADER,
+    ZIP64_END_OF_CENTRAL_DIRECTORY, ZIP64_EXTRA, ZIP64_LOCATOR, index_pk3
+)
+from storage import cache_path, atomic_write_json, load_json
+from tracing import span, traced
+
+BUNDLE_DIR = "bundles"
+BUNDLE_INDEX = "index.json"
+BUNDLE_FORMAT = 2
+BUNDLE_EXTENSIONS = (".pk3", ".pke", ".zip")
+MAX_CACHE_BYTES = 4096 * 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+DATA_DESCRIPTOR_FLAG = 0x8
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+ZIP64_VERSION = 45
+MADE_BY = 0x0314
+
+
+def root_folder(index):
+    names = index.names()
+    folders = {name.split("/", 1)[0].lower() if "/" in name else None for name in names}
+    if len(folders) == 1 and None not in folders:
+        return folders.pop()
+    return None
+
+
+def is_bundleable(index):
+    # GZDoom treats a pk3 whose files all sit in one folder as if that folder
+    # were its root, and loads WADs at the root right after their archive;
+    # both only behave the same when the archive is passed on its own.
+    if root_folder(index) not in (None, "maps", "filter", *NAMESPACES):
+        return False
+    return not any("/" not in name and name.lower().endswith(".wad") for name in index.names())
+
+
+def merged_lumps(index):
+    return {short_name(name) for name in index.names() if "/" not in name and short_name(name) in MERGED_LUMPS}
+
+
+def resource_names(index):
+    # Full paths grouped by the short name the engine also looks them up by.
+    resources = {}
+    for name in index.names():
+        key = pk3_resource_key(name)
+        if key is not None:
+            resources.setdefault(key, set()).add(name.lower())
+    return resources
+
+
+def plan_bundles(paths):
+    # Consecutive pk3s are grouped in load order; anything else stays a plain
+    # path. Definition lumps such as DECORATE are read from every archive, so
+    # two archives that both carry one at their root start separate groups.
+    # So do two archives whose different files share a short name (such as
+    # textures/brickwall_red.png and textures/brickwall_blue.png): kept
+    # apart, each stays reachable by its full path.
+    groups = []
+    current = None
+    for path in paths:
+        index = None
+        if path.lower().endswith(BUNDLE_EXTENSIONS):
+            try:
+                index = index_pk3(path)
+            except (OSError, ValueError, ArchiveError, struct.error):
+                index = None
+        if index is None or not is_bundleable(index):
+            groups.append(path)
+            current = None
+            continue
+        lumps = merged_lumps(index)
+        resources = resource_names(index)
+        if current is None or current[1] & lumps or any(
+            key in current[2] and len(current[2][key] | names) > 1 for key, names in resources.items()
+        ):
+            current = ([], set(), {})
+            groups.append(current[0])
+        current[0].append(index)
+        current[1].update(lumps)
+        for key, names in resources.items():
+            current[2].setdefault(key, set()).update(names)
+    return groups
+
+
+def surviving_entries(indexes):
+    # The last archive to provide a full path wins, as it would in the
+    # engine; earlier copies are left out of the bundle. plan_bundles keeps
+    # archives whose short names collide on other paths out of one group.
+    seen = set()
+    kept = []
+    for index in reversed(indexes):
+        names = [name.lower() for name in index.names()]
+        kept.append((index, [entry for entry, name in enumerate(names) if name not in seen]))
+        seen.update(names)
+    kept.reverse()
+    return kept
+
+
+def bundle_key(indexes):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(BUNDLE_FORMAT).encode("ascii"))
+    for index in indexes:
+        digest.update(f"\0{index.path}\0{index.size}\0{index.mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def copy_range(source, target, length):
+    while length:
+        chunk = source.read(min(length, COPY_CHUNK))
+        if not chunk:
+            raise ArchiveError(f"{source.name} is truncated")
+        target.write(chunk)
+        length -= len(chunk)
+
+
+def zip64_extra(*values):
+    return struct.pack("<HH", ZIP64_EXTRA, 8 * len(values)) + struct.pack(f"<{len(values)}Q", *values)
+
+
+def write_bundle(target, members):
+    # Entries are copied as they are stored, compressed data included; only
+    # the headers are rewritten, with sizes taken from the central directory.
+    directory = []
+    for index, entries in members:
+        with open(index.path, 'rb') as source:
+            for entry in entries:
+                source.seek(index.offsets[entry])
+                header = source.read(LOCAL_FILE_HEADER.size)
+                if len(header) < LOCAL_FILE_HEADER.size or header[:4] != b"PK\x03\x04":
+                    raise ArchiveError(f"Corrupt local header for {index.name(entry)} in {index.path}")
+                _, version, _, method, mod_time, mod_date, _, _, _, name_length, extra_length = LOCAL_FILE_HEADER.unpack(header)
+                source.seek(name_length + extra_length, os.SEEK_CUR)
+
+                name = index.name_data[index.name_offsets[entry]:index.name_offsets[entry + 1]]
+                flag = index.flags[entry] & ~DATA_DESCRIPTOR_FLAG
+                crc, compressed_size, size = index.crcs[entry], index.compressed_sizes[entry], index.sizes[entry]
+                offset = target.tell()
+                large = compressed_size >= ZIP64_LIMIT or size >= ZIP64_LIMIT
+                extra = zip64_extra(size, compressed_size) if large else b""
+                version = max(version, ZIP64_VERSION) if large else version
+                target.write(LOCAL_FILE_HEADER.pack(
+                    b"PK\x03\x04", version, flag, method, mod_time, mod_date, crc,
+                    ZIP64_LIMIT if large else compressed_size, ZIP64_LIMIT if large else size, len(name), len(extra)
+                ))
+                target.write(name)
+                target.write(extra)
+                copy_range(source, target, compressed_size)
+                directory.append((version, flag, method, mod_time, mod_date, crc, compressed_size, size, name, offset))
+
+    directory_offset = target.tell()
+    for version, flag, method, mod_time, mod_date, crc, compressed_size, size, name, offset in directory:
+        large = [value >= ZIP64_LIMIT for value in (size, compressed_size, offset)]
+        extra = zip64_extra(*(value for value, is_large in zip((size, compressed_size, offset), large) if is_large)) if any(large) else b""
+        target.write(CENTRAL_DIRECTORY_ENTRY.pack(
+            b"PK\x01\x02", MADE_BY, max(version, ZIP64_VERSION) if any(large) else version, flag, method, mod_time, mod_date, crc,
+            ZIP64_LIMIT if large[1] else compressed_size, ZIP64_LIMIT if large[0] else size,
+            len(name), len(extra), 0, 0, 0, 0, ZIP64_LIMIT if large[2] else offset
+        ))
+        target.write(name)
+        target.write(extra)
+    directory_size = target.tell() - directory_offset
+
+    count = len(directory)
+    if count >= ZIP64_COUNT_LIMIT or directory_size >= ZIP64_LIMIT or directory_offset >= ZIP64_LIMIT:
+        zip64_offset = target.tell()
+        target.write(ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+            b"PK\x06\x06", ZIP64_END_OF_CENTRAL_DIRECTORY.size - 12, MADE_BY, ZIP64_VERSION, 0, 0,
+            count, count, directory_size, directory_offset
+        ))
+        target.write(ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_offset, 1))
+        count = min(count, ZIP64_COUNT_LIMIT)
+        directory_size = min(directory_size, ZIP64_LIMIT)
+        directory_offset = min(directory_offset, ZIP64_LIMIT)
+    target.write(END_OF_CENTRAL_DIRECTORY.pack(b"PK\x05\x06", 0, 0, count, count, directory_size, directory_offset, 0))
+
+
+class BundleCache:
+    # Each bundle is named after the paths, sizes and mtimes of its archives,
+    # so a changed mod simply produces a new name. index.json records the
+    # size and last use of every bundle; the least recently used ones are
+    # deleted once the total grows past max_bytes.
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.index_file = cache_path(BUNDLE_DIR, BUNDLE_INDEX)
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.entries = load_json(self.index_file, {})
+
+    def bundle_file(self, name):
+        return cache_path(BUNDLE_DIR, name)
+
+    @traced("bundle.launch_files")
+    def launch_files(self, paths):
+        # Archives that cannot be merged are passed through where they are,
+        # so the engine sees everything in the original load order.
+        files = []
+        built = []
+        for group in plan_bundles(paths):
+            if isinstance(group, str) or len(group) == 1:
+                files.append(group if isinstance(group, str) else group[0].path)
+                continue
+            name = self.bundle(group)
+            built.append(name)
+            files.append(os.path.abspath(self.bundle_file(name)))
+        if built:
+            self.evict(keep=built)
+        return files
+
+    def bundle(self, indexes):
+        name = bundle_key(indexes) + ".pk3"
+        path = self.bundle_file(name)
+        with self.build_lock:
+            if not self.is_cached(name, path):
+                with span("bundle.build", archives=len(indexes)):
+                    self.build(path, indexes)
+            with self.lock:
+                self.entries[name] = [os.path.getsize(path), time.time()]
+        return name
+
+    def is_cached(self, name, path):
+        with self.lock:
+            cached = self.entries.get(name)
+        try:
+            return cached is not None and os.path.getsize(path) == cached[0]
+        except OSError:
+            return False
+
+    def build(self, path, indexes):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pk3")
+        try:
+            with os.fdopen(fd, 'wb') as target:
+                write_bundle(target, surviving_entries(indexes))
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self, keep=()):
+        with self.lock:
+            entries = sorted(self.entries.items(), key=lambda item: item[1][1])
+            total = sum(entry[0] for _, entry in entries)
+            for name, (size, _) in entries:
+                if total <= self.max_bytes:
+                    break
+                if name in keep:
+                    continue
+                try:
+                    os.remove(self.bundle_file(name))
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                del self.entries[name]
+                total -= size
+            snapshot = dict(self.entries)
+        atomic_write_json(self.index_file, snapshot)
+
+
+_bundle_cache = None
+
+
+def get_bundle_cache():
+    global _bundle_cache
+    if _bundle_cache is None:
+        _bundle_cache = BundleCache()
+    return _bundle_cache
@@ -0,0 +1,107 @@
+import os
+import sys
+import sqlite3
+import argparse
+import subprocess
+
+from bundles import get_bundle_cache
+from config_manager import get_config_manager
+from launcher import build_command, validate_launch
+from preset_catalog import get_catalog
+import tracing
+
+HEADLESS_OPTIONS = ("--preset", "--list", "--validate", "--delete", "--rename")
+
+
+def is_headless(argv):
+    return any(arg.split("=", 1)[0] in HEADLESS_OPTIONS for arg in argv)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description="Launch MOOD SELECTOR presets without the GUI.")
+    parser.add_argument("--preset", help="launch GZDoom with this preset")
+    parser.add_argument("--list", action="store_true", help="list the available presets")
+    parser.add_argument("--validate", metavar="PRESET", help="check a preset's mods and the engine without launching")
+    parser.add_argument("--delete", metavar="PRESET", help="delete a preset")
+    parser.add_argument("--rename", nargs=2, metavar=("PRESET", "NEW_NAME"), help="rename a preset")
+    parser.add_argument("--bundle", action="store_true", help="merge the preset's mods into one cached archive before launching")
+    parser.add_argument("--response-file", action="store_true", help="pass the mods to GZDoom through a response file")
+    return parser
+
+
+def find_preset(catalog, name):
+    # Older shortcuts name the preset's JSON file; names match case-insensitively.
+    if name.endswith(".json"):
+        name = name[:-len(".json")]
+    return catalog.find(name)
+
+
+def resolve_preset(catalog, name):
+    preset_name = find_preset(catalog, name)
+    if preset_name is None:
+        raise LookupError(f"Unknown preset: {name.removesuffix('.json')}")
+    return catalog.load(preset_name)
+
+
+def exec_engine(command):
+    if sys.platform == "win32":
+        subprocess.Popen(command)
+        return 0
+    # execv replaces the process without running atexit handlers, so the
+    # config and the trace are written out first.
+    tracing.mark("launch.exec", files=len(command))
+    get_config_manager().flush()
+    if tracing.enabled:
+        tracing.finish()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(command[0], command)
+
+
+def main(argv=None):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if not (args.list or args.preset or args.validate or args.delete or args.rename):
+        parser.error("one of --preset, --list, --validate, --delete or --rename is required")
+    catalog = get_catalog()
+
+    if args.list:
+        for preset_name in catalog.preset_names():
+            print(preset_name)
+        return 0
+
+    if args.delete or args.rename:
+        name = args.delete or args.rename[0]
+        try:
+            preset_name = find_preset(catalog, name)
+            if preset_name is None:
+                raise LookupError(f"Unknown preset: {name.removesuffix('.json')}")
+            if args.delete:
+                catalog.delete(preset_name)
+            else:
+                catalog.rename(preset_name, args.rename[1].strip())
+        except (LookupError, ValueError, sqlite3.Error) as e:
+            print(f"Could not {'delete' if args.delete else 'rename'} the preset: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    name = args.validate or args.preset
+    try:
+        pk3_files = resolve_preset(catalog, name)
+    except (LookupError, OSError, ValueError) as e:
+        print(f"Could not load the preset: {e}", file=sys.stderr)
+        return 1
+    if not pk3_files:
+        print("No mods in this preset.", file=sys.stderr)
+        return 1
+
+    config = get_config_manager().config
+    gzdoom_path = config.get("gzdoom_path", "")
+    problems = validate_launch(gzdoom_path, pk3_files)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems or args.validate:
+        return 1 if problems else 0
+    if args.bundle or config.get("bundled_launch"):
+        pk3_files = get_bundle_cache().launch_files(pk3_files)
+    return exec_engine(build_command(gzdoom_path, pk3_files, args.response_file or config.get("response_file_launch", False)))
@@ -0,0 +1,77 @@
+import atexit
+import threading
+
+from storage import atomic_write_json, load_json
+from tracing import span, traced
+
+CONFIG_FILE = "config.json"
+SAVE_DELAY = 0.5
+DEFAULT_CONFIG = {
+    "gzdoom_path": "",
+    "pk3_files": [],
+    "library_roots": [],
+    "bundled_launch": False,
+    "response_file_launch": False,
+    "theme": "",
+    "resident": False,
+    "preset_window_position": (100, 100),
+    "options_window_position": (100, 100)
+}
+
+
+class ConfigManager:
+    def __init__(self, config_file=CONFIG_FILE, save_delay=SAVE_DELAY):
+        self.config_file = config_file
+        self.save_delay = save_delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.save_timer = None
+        self.dirty = False
+        self.config = self.load_config()
+
+    @traced("config.load")
+    def load_config(self):
+        config = dict(DEFAULT_CONFIG)
+        stored = load_json(self.config_file, {})
+        if isinstance(stored, dict):
+            config.update(stored)
+        return config
+
+    def save_config(self):
+        # Writes are coalesced: every call pushes the deadline back, so a burst
+        # of updates ends up as a single write once things settle down.
+        with self.lock:
+            self.dirty = True
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+            self.save_timer = threading.Timer(self.save_delay, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if self.save_timer is not None:
+                    self.save_timer.cancel()
+                    self.save_timer = None
+                if not self.dirty:
+                    return
+                snapshot = dict(self.config)
+                self.dirty = False
+            with span("config.write"):
+                atomic_write_json(self.config_file, snapshot, indent=4)
+
+    def update_gzdoom_path(self, path):
+        self.config["gzdoom_path"] = path
+        self.save_config()
+
+
+_config_manager = None
+
+
+def get_config_manager():
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = ConfigManager()
+        atexit.register(_config_manager.flush)
+    return _config_manager
@@ -0,0 +1,141 @@
+import os
+import threading
+
+from archives import index_archive
+
+# Directories (pk3) and marker ranges (WAD) that GZDoom looks up by short
+# lump name, so "sprites/a/posaa1.png" and an S_START..S_END "POSAA1" collide.
+NAMESPACES = {"sprites", "flats", "patches", "textures", "graphics", "sounds", "music", "colormaps", "acs", "voxels", "hires", "voices"}
+WAD_MARKERS = {
+    "S_START": "sprites", "SS_START": "sprites", "S_END": None, "SS_END": None,
+    "F_START": "flats", "FF_START": "flats", "F_END": None, "FF_END": None,
+    "P_START": "patches", "PP_START": "patches", "P_END": None, "PP_END": None,
+    "TX_START": "textures", "TX_END": None,
+    "C_START": "colormaps", "C_END": None,
+    "A_START": "acs", "A_END": None,
+    "V_START": "voxels", "V_END": None,
+    "HI_START": "hires", "HI_END": None
+}
+MAP_LUMPS = {
+    "THINGS", "LINEDEFS", "SIDEDEFS", "VERTEXES", "SEGS", "SSECTORS", "NODES", "SECTORS", "REJECT",
+    "BLOCKMAP", "BEHAVIOR", "SCRIPTS", "TEXTMAP", "ZNODES", "DIALOGUE", "ENDMAP", "LEAFS", "LIGHTS", "MACROS"
+}
+# Definition lumps are read from every archive and merged by the engine rather
+# than replaced, so having them in several mods is not a conflict.
+MERGED_LUMPS = {
+    "mapinfo", "zmapinfo", "umapinfo", "emapinfo", "decorate", "zscript", "sndinfo", "sndseq", "keyconf",
+    "gldefs", "doomdefs", "hticdefs", "hexndefs", "strfdefs", "language", "textures", "animdefs", "terrain",
+    "menudef", "cvarinfo", "lockdefs", "loadacs", "decaldef", "fontdefs", "modeldef", "reverbs", "voxeldef",
+    "trnslate", "gameinfo", "teaminfo", "palvers", "x11r6rgb", "alttexts", "sbarinfo", "iwadinfo"
+}
+
+_resource_keys = {}
+_resource_keys_lock = threading.Lock()
+
+
+def short_name(file_name):
+    return os.path.splitext(file_name)[0][:8].lower()
+
+
+def pk3_resource_key(name):
+    parts = name.lower().split("/")
+    if len(parts) == 1:
+        lump = short_name(parts[0])
+        return None if lump in MERGED_LUMPS else "global/" + lump
+    if parts[0] in NAMESPACES:
+        return parts[0] + "/" + short_name(parts[-1])
+    if parts[0] == "maps":
+        return "maps/" + short_name(parts[-1])
+    if parts[0] in MERGED_LUMPS:
+        return None
+    return "/".join(parts)
+
+
+def wad_resource_keys(directory):
+    keys = []
+    namespace = "global"
+    previous = None
+    for name in directory.names():
+        if name in WAD_MARKERS:
+            namespace = WAD_MARKERS[name] or "global"
+            previous = None
+        elif name in MAP_LUMPS:
+            # Map data lumps follow their MAPxx/ExMy header; only the map
+            # itself can override another archive's map.
+            if previous is not None:
+                keys[-1] = "maps/" + previous.lower()
+                previous = None
+        elif namespace == "global" and name.lower() in MERGED_LUMPS:
+            previous = None
+        else:
+            keys.append(namespace + "/" + name.lower())
+            previous = name
+    return keys
+
+
+def resource_keys(path):
+    index = index_archive(path)
+    signature = (index.path, index.size, index.mtime_ns)
+    with _resource_keys_lock:
+        cached = _resource_keys.get(index.path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    if index.kind == "wad":
+        keys = wad_resource_keys(index)
+    else:
+        keys = [pk3_resource_key(name) for name in index.names()]
+    keys = frozenset(key for key in keys if key is not None)
+    with _resource_keys_lock:
+        _resource_keys[index.path] = (signature, keys)
+    return keys
+
+
+class ConflictReport:
+    def __init__(self, paths, shadows, errors):
+        self.paths = paths
+        self.shadows = shadows
+        self.errors = errors
+
+    def __bool__(self):
+        return bool(self.shadows)
+
+    def total(self):
+        return sum(len(names) for names in self.shadows.values())
+
+    def shadowed_by(self, later):
+        return {earlier: names for (index, earlier), names in self.shadows.items() if index == later}
+
+    def summary(self, max_pairs=10, max_names=3):
+        if not self.shadows and not self.errors:
+            return "No conflicts between these mods."
+        lines = []
+        pairs = sorted(self.shadows.items(), key=lambda item: -len(item[1]))
+        for (later, earlier), names in pairs[:max_pairs]:
+            examples = ", ".join(sorted(names)[:max_names])
+            lines.append(f"{os.path.basename(self.paths[later])} overrides {len(names)} from "
+                         f"{os.path.basename(self.paths[earlier])} ({examples})")
+        if len(pairs) > max_pairs:
+            lines.append(f"...and {len(pairs) - max_pairs} more overlapping pairs")
+        for path, message in self.errors:
+            lines.append(f"Could not read {os.path.basename(path)}: {message}")
+        return "\n".join(lines)
+
+
+def analyze_conflicts(paths):
+    # Hash join over load order: each key remembers the last archive that
+    # provided it, so every entry is visited once regardless of mod count.
+    owners = {}
+    shadows = {}
+    errors = []
+    for later, path in enumerate(paths):
+        try:
+            keys = resource_keys(path)
+        except Exception as e:
+            errors.append((path, str(e)))
+            continue
+        for key in keys:
+            earlier = owners.get(key)
+            if earlier is not None:
+                shadows.setdefault((later, earlier), []).append(key)
+            owners[key] = later
+    return ConflictReport(list(paths), shadows, errors)
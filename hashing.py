@@ -0,0 +1,141 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from storage import cache_path, atomic_write_json, load_json
+
+HASH_CACHE = "hashes.json"
+CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path):
+    # hashlib drops the GIL for large updates, so several of these can run on
+    # a thread pool and keep every core busy.
+    digest = hashlib.blake2b(digest_size=20)
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+
+class HashService:
+    def __init__(self, max_workers=None):
+        self.cache_file = cache_path(HASH_CACHE)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.lock = threading.Lock()
+        self.digests = load_json(self.cache_file, {})
+        self.dirty = False
+
+    def cached_digest(self, path, stat):
+        cached = self.digests.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        return None
+
+    def digest(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.lock:
+            digest = self.cached_digest(path, stat)
+        if digest is None:
+            digest = hash_file(path)
+            with self.lock:
+                self.digests[path] = [stat.st_size, stat.st_mtime_ns, digest]
+                self.dirty = True
+        return digest
+
+    def digest_many(self, paths):
+        digests = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hash") as executor:
+            futures = {executor.submit(self.digest, path): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    digests[path] = future.result()
+                except OSError as e:
+                    errors[path] = str(e)
+        self.save()
+        return digests, errors
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = dict(self.digests)
+            self.dirty = False
+        atomic_write_json(self.cache_file, snapshot)
+
+
+class DuplicateReport:
+    def __init__(self, groups, sizes, errors):
+        self.groups = groups
+        self.sizes = sizes
+        self.errors = errors
+
+    def __bool__(self):
+        return bool(self.groups)
+
+    def wasted_bytes(self):
+        return sum(self.sizes[group[0]] * (len(group) - 1) for group in self.groups)
+
+    def summary(self, max_groups=10):
+        if not self.groups and not self.errors:
+            return "No duplicate mods found."
+        lines = []
+        if self.groups:
+            lines.append(f"{len(self.groups)} duplicated mods, {self.wasted_bytes() / (1 << 20):.1f} MB wasted:")
+        for group in self.groups[:max_groups]:
+            lines.append(" = ".join(group))
+        if len(self.groups) > max_groups:
+            lines.append(f"...and {len(self.groups) - max_groups} more")
+        for path, message in self.errors.items():
+            lines.append(f"Could not read {path}: {message}")
+        return "\n".join(lines)
+
+
+def find_duplicates(paths, service=None):
+    service = service or get_hash_service()
+    sizes = {}
+    errors = {}
+    for path in dict.fromkeys(os.path.realpath(path) for path in paths):
+        try:
+            sizes[path] = os.stat(path).st_size
+        except OSError as e:
+            errors[path] = str(e)
+
+    # Only files that share a size can be identical, so everything else is
+    # never read at all.
+    by_size = {}
+    for path, size in sizes.items():
+        by_size.setdefault(size, []).append(path)
+    candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+    digests, hash_errors = service.digest_many(candidates)
+    errors.update(hash_errors)
+
+    by_digest = {}
+    for path in candidates:
+        if path in digests:
+            by_digest.setdefault(digests[path], []).append(path)
+    groups = sorted((sorted(group) for group in by_digest.values() if len(group) > 1), key=lambda group: -sizes[group[0]])
+    return DuplicateReport(groups, sizes, errors)
+
+
+def library_files(catalog, pk3_files):
+    return list(pk3_files) + catalog.mod_paths()
+
+
+_hash_service = None
+
+
+def get_hash_service():
+    global _hash_service
+    if _hash_service is None:
+        _hash_service = HashService()
+    return _hash_service
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import socket
+import getpass
+import hashlib
+import tempfile
+import threading
+
+import cli
+
+INSTANCE_PREFIX = "mood-selector-"
+CONNECT_TIMEOUT = 2.0
+LOCAL_OPTIONS = ("--list", "--validate", "--delete", "--rename")
+
+
+def server_name():
+    # One running instance per user and program folder, since config.json and
+    # presets.db are read from the working directory. The name is what
+    # QLocalServer listens on: a named pipe on Windows, a socket file elsewhere.
+    digest = hashlib.blake2b(f"{getpass.getuser()}\0{os.path.abspath('.')}".encode("utf-8"), digest_size=8).hexdigest()
+    if sys.platform == "win32":
+        return INSTANCE_PREFIX + digest
+    return os.path.join(tempfile.gettempdir(), INSTANCE_PREFIX + digest)
+
+
+def pipe_exchange(path, data, timeout):
+    # File reads on a Windows pipe cannot time out, so the exchange runs on
+    # a thread that is left behind if the window does not answer in time.
+    replies = []
+
+    def exchange():
+        try:
+            with open(path, 'r+b', buffering=0) as pipe:
+                pipe.write(data)
+                replies.append(pipe.readline())
+        except OSError:
+            pass
+
+    thread = threading.Thread(target=exchange, name="instance-request", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return replies[0] if replies else None
+
+
+def send_request(request, timeout=CONNECT_TIMEOUT):
+    # Plain sockets and pipes keep a forwarded launch free of the Qt import.
+    # Returns the reply, "ok" or "error", or None when nothing answered in
+    # time.
+    data = (json.dumps(request) + "\n").encode("utf-8")
+    try:
+        if sys.platform == "win32":
+            reply = pipe_exchange("\\\\.\\pipe\\" + server_name(), data, timeout)
+            if reply is None:
+                return None
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(timeout)
+                connection.connect(server_name())
+                connection.sendall(data)
+                with connection.makefile('rb') as stream:
+                    reply = stream.readline()
+    except OSError:
+        return None
+    reply = reply.strip().decode("ascii", "replace")
+    return reply if reply in ("ok", "error") else None
+
+
+def is_running():
+    return send_request({"command": "ping"}) == "ok"
+
+
+def forward(argv):
+    # Plain launches and --preset go to the window that is already open;
+    # --list, --validate and the preset edits print to this terminal, so
+    # they always run here.
+    # Returns the exit status once the window has answered, or None when the
+    # launch has to be handled by this process.
+    if any(arg.split("=", 1)[0] in LOCAL_OPTIONS for arg in argv):
+        return None
+    if cli.is_headless(argv):
+        args = cli.create_parser().parse_args(argv)
+        request = {"command": "preset", "name": args.preset, "bundle": args.bundle, "response_file": args.response_file}
+    else:
+        request = {"command": "show"}
+    reply = send_request(request)
+    if reply == "error" and request["command"] == "preset":
+        # The window checks the preset before it answers, so an unknown one
+        # fails here just as it would without a window open.
+        print(f"Could not load the preset: Unknown preset: {request['name'].removesuffix('.json')}", file=sys.stderr)
+    return None if reply is None else int(reply != "ok")
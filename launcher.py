@@ -0,0 +1,104 @@
+import os
+import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import cache_path, atomic_write_bytes
+from tracing import traced
+
+ARCHIVE_HEADERS = {
+    ".pk3": (b"PK\x03\x04", b"PK\x05\x06"),
+    ".ipk3": (b"PK\x03\x04", b"PK\x05\x06"),
+    ".pke": (b"PK\x03\x04", b"PK\x05\x06"),
+    ".zip": (b"PK\x03\x04", b"PK\x05\x06"),
+    ".pk7": (b"7z\xbc\xaf",),
+    ".ipk7": (b"7z\xbc\xaf",),
+    ".7z": (b"7z\xbc\xaf",),
+    ".wad": (b"IWAD", b"PWAD"),
+    ".iwad": (b"IWAD", b"PWAD")
+}
+VALIDATION_WORKERS = 16
+RESPONSE_DIR = "responses"
+# CreateProcess takes at most 32767 characters; elsewhere the arguments share
+# ARG_MAX with the environment, so only half of it is counted on.
+WINDOWS_COMMAND_LIMIT = 32000
+
+
+def check_mod_file(path):
+    if not os.path.exists(path):
+        return f"Missing file: {path}"
+    if not os.access(path, os.R_OK):
+        return f"Not readable: {path}"
+    if os.path.isdir(path):
+        # -file also takes a folder, which GZDoom loads like an archive.
+        return None
+    if not os.path.isfile(path):
+        return f"Not a file: {path}"
+    headers = ARCHIVE_HEADERS.get(os.path.splitext(path)[1].lower())
+    if headers is None:
+        return None
+    try:
+        with open(path, 'rb') as file:
+            header = file.read(4)
+    except OSError as e:
+        return f"Could not read {path}: {e.strerror}"
+    if header not in headers:
+        return f"Not a valid {os.path.splitext(path)[1].lower()[1:]} archive: {path}"
+    return None
+
+
+def check_engine(gzdoom_path):
+    if not gzdoom_path:
+        return "GZDoom is not configured."
+    if not os.path.isfile(gzdoom_path):
+        return f"GZDoom not found: {gzdoom_path}"
+    if sys.platform != "win32" and not os.access(gzdoom_path, os.X_OK):
+        return f"GZDoom is not executable: {gzdoom_path}"
+    return None
+
+
+@traced("launch.validate")
+def validate_launch(gzdoom_path, pk3_files, max_workers=VALIDATION_WORKERS):
+    # Every check is a few syscalls that mostly wait on storage, so they are
+    # issued concurrently and all problems are reported in one go.
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="validate") as executor:
+        engine_check = executor.submit(check_engine, gzdoom_path)
+        file_checks = list(executor.map(check_mod_file, pk3_files))
+    problems = [engine_check.result()] + file_checks
+    return [problem for problem in problems if problem is not None]
+
+
+def command_limit():
+    if sys.platform == "win32":
+        return WINDOWS_COMMAND_LIMIT
+    try:
+        return os.sysconf("SC_ARG_MAX") // 2
+    except (ValueError, OSError):
+        return WINDOWS_COMMAND_LIMIT
+
+
+def command_length(command):
+    # Every argument may be quoted and is followed by a separator.
+    return sum(len(arg) + 3 for arg in command)
+
+
+def response_file(pk3_files):
+    # GZDoom reads further arguments from "@file". The file is named after
+    # its contents, so launching the same mods again reuses it as it is.
+    if any('"' in path or "\n" in path for path in pk3_files):
+        return None
+    data = "-file\n" + "".join(f'"{path}"\n' for path in pk3_files)
+    data = data.encode("utf-8")
+    path = cache_path(RESPONSE_DIR, hashlib.blake2b(data, digest_size=16).hexdigest() + ".rsp")
+    if not os.path.exists(path):
+        atomic_write_bytes(path, data)
+    return os.path.abspath(path)
+
+
+def build_command(gzdoom_path, pk3_files, use_response_file=False):
+    command = [gzdoom_path] + ["-file"] + list(pk3_files)
+    if use_response_file or command_length(command) > command_limit():
+        path = response_file(pk3_files)
+        if path is not None:
+            return [gzdoom_path, "@" + path]
+    return command
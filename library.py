@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from storage import cache_path, atomic_write_json, load_json
+from tracing import traced
+
+LIBRARY_FILE = "library.json"
+LIBRARY_EXTENSIONS = (".pk3", ".pk7", ".wad", ".ipk3")
+SCAN_WORKERS = 8
+BATCH_SIZE = 500
+BATCH_INTERVAL = 0.1
+
+
+class ScanReport:
+    def __init__(self):
+        self.directories = 0
+        self.rescanned = 0
+        self.files = 0
+        self.added = 0
+        self.removed = 0
+        self.errors = {}
+        self.duration = 0.0
+
+    def summary(self):
+        text = f"{self.files} mods in {self.directories} folders, {self.rescanned} rescanned in {self.duration:.1f}s."
+        if self.errors:
+            text += f" {len(self.errors)} folders could not be read."
+        return text
+
+
+def scan_directory(path, cached):
+    # A directory's mtime changes whenever an entry is added, removed or
+    # renamed in it, so an unchanged mtime means the cached listing is exact.
+    mtime = os.stat(path).st_mtime_ns
+    if cached is not None and cached[0] == mtime:
+        return cached, False
+    files = []
+    subdirectories = []
+    with os.scandir(path) as scan:
+        for entry in scan:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.name)
+            elif entry.name.lower().endswith(LIBRARY_EXTENSIONS) and entry.is_file():
+                files.append(entry.name)
+    return [mtime, sorted(files), sorted(subdirectories)], True
+
+
+class ModLibrary:
+    def __init__(self):
+        self.library_file = cache_path(LIBRARY_FILE)
+        stored = load_json(self.library_file, {})
+        self.roots = stored.get("roots", [])
+        self.directories = stored.get("directories", {})
+
+    def files(self):
+        return [os.path.join(path, name) for path, entry in self.directories.items() for name in entry[1]]
+
+    def save(self):
+        atomic_write_json(self.library_file, {"roots": self.roots, "directories": self.directories})
+
+    @traced("library.scan")
+    def scan(self, roots, on_files=None, max_workers=SCAN_WORKERS):
+        # Directories are listed concurrently; every finished listing queues
+        # its subdirectories. Mods that were not known before are handed to
+        # on_files in batches while the walk is still running.
+        started = time.perf_counter()
+        roots = list(dict.fromkeys(os.path.abspath(root) for root in roots))
+        previous = self.directories
+        directories = {}
+        report = ScanReport()
+        batch = []
+        flushed = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="library") as executor:
+            queued = set(roots)
+            pending = {executor.submit(scan_directory, root, previous.get(root)): root for root in roots}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        entry, rescanned = future.result()
+                    except OSError as e:
+                        report.errors[path] = e.strerror or str(e)
+                        continue
+                    directories[path] = entry
+                    report.rescanned += rescanned
+                    report.files += len(entry[1])
+                    if rescanned:
+                        known = set(previous[path][1]) if path in previous else ()
+                        added = [os.path.join(path, name) for name in entry[1] if name not in known]
+                        report.added += len(added)
+                        batch.extend(added)
+                    for name in entry[2]:
+                        child = os.path.join(path, name)
+                        if child not in queued:
+                            queued.add(child)
+                            pending[executor.submit(scan_directory, child, previous.get(child))] = child
+                    if on_files is not None and batch and (len(batch) >= BATCH_SIZE or time.perf_counter() - flushed >= BATCH_INTERVAL):
+                        on_files(batch)
+                        batch = []
+                        flushed = time.perf_counter()
+
+        if on_files is not None and batch:
+            on_files(batch)
+        report.directories = len(directories)
+        report.removed = len(self.files()) + report.added - report.files
+        report.duration = time.perf_counter() - started
+        self.roots = roots
+        self.directories = directories
+        self.save()
+        return report
+
+
+_library = None
+
+
+def get_library():
+    global _library
+    if _library is None:
+        _library = ModLibrary()
+    return _library
@@ -0,0 +1,190 @@
+import os
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QFileDialog
+from PyQt6.QtCore import QStringListModel
+
+from mod_list_model import ModListModel
+from search_index import SearchIndex, build_index
+from tasks import in_gui_thread, run_in_background
+from tracing import mark
+
+ROOTS_HEIGHT = 60
+
+
+class LibraryPage(QWidget):
+    def __init__(self, shell, library, config_manager, mods_page="options"):
+        super().__init__()
+        self.shell = shell
+        self.library = library
+        self.config_manager = config_manager
+        self.mods_page = mods_page
+        self.scanning = False
+        self.scanned = False
+        self.files = []
+        self.files_version = 0
+        self.library_model = ModListModel(parent=self)
+        self.library_index = SearchIndex()
+        self.library_index_version = None
+        self.init_ui()
+        self.show_files(self.library.files())
+
+    def init_ui(self):
+        self.setWindowTitle("Mod Library")
+        self.setFixedSize(400, 500)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(50, 50, 50, 50)
+
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        status_layout.addWidget(self.status_label, 1)
+        self.rescan_button = QPushButton("Rescan")
+        self.rescan_button.clicked.connect(self.start_scan)
+        status_layout.addWidget(self.rescan_button)
+        layout.addLayout(status_layout)
+
+        self.roots_model = QStringListModel(self.roots(), self)
+        self.roots_view = QListView()
+        self.roots_view.setModel(self.roots_model)
+        self.roots_view.setFixedHeight(ROOTS_HEIGHT)
+        layout.addWidget(self.roots_view)
+
+        roots_layout = QHBoxLayout()
+        self.add_root_button = QPushButton("Add Folder")
+        self.add_root_button.clicked.connect(self.add_root)
+        roots_layout.addWidget(self.add_root_button)
+        self.remove_root_button = QPushButton("Remove")
+        self.remove_root_button.clicked.connect(self.remove_root)
+        roots_layout.addWidget(self.remove_root_button)
+        layout.addLayout(roots_layout)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search library")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.filter_files)
+        layout.addWidget(self.search_input)
+
+        self.files_view = QListView()
+        self.files_view.setModel(self.library_model)
+        self.files_view.setUniformItemSizes(True)
+        self.files_view.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.files_view.doubleClicked.connect(lambda index: self.add_to_mods([self.library_model.path(index.row())]))
+        layout.addWidget(self.files_view)
+
+        buttons_layout = QHBoxLayout()
+        self.add_mods_button = QPushButton("Add Selected")
+        self.add_mods_button.clicked.connect(self.add_selected)
+        buttons_layout.addWidget(self.add_mods_button)
+        self.back_button = QPushButton("Back")
+        self.back_button.clicked.connect(lambda: self.shell.show_page(self.mods_page))
+        buttons_layout.addWidget(self.back_button)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+    def roots(self):
+        return list(self.config_manager.config.get("library_roots", []))
+
+    def page_shown(self):
+        # The stored library is shown right away; a re-scan only has to look
+        # at folders whose mtime moved since the last one.
+        if not self.scanned:
+            self.start_scan()
+
+    def add_root(self):
+        path = QFileDialog.getExistingDirectory(self, "Add Library Folder")
+        if path and path not in self.roots():
+            self.set_roots(self.roots() + [path])
+            self.start_scan()
+
+    def remove_root(self):
+        rows = sorted((index.row() for index in self.roots_view.selectionModel().selectedRows()), reverse=True)
+        if not rows:
+            return
+        roots = self.roots()
+        for row in rows:
+            del roots[row]
+        self.set_roots(roots)
+        self.start_scan()
+
+    def set_roots(self, roots):
+        self.config_manager.config["library_roots"] = roots
+        self.config_manager.save_config()
+        self.roots_model.setStringList(roots)
+
+    def start_scan(self):
+        if self.scanning:
+            return
+        self.scanning = True
+        self.scanned = True
+        self.rescan_button.setEnabled(False)
+        self.status_label.setText("Scanning the library...")
+        mark("library.scan_started", roots=len(self.roots()))
+        run_in_background(
+            self.library.scan, self.roots(), in_gui_thread(self.files_found),
+            callback=self.scan_finished,
+            error_callback=self.scan_failed
+        )
+
+    def files_found(self, paths):
+        self.files.extend(paths)
+        self.files_version += 1
+        if not self.search_input.text().strip():
+            self.library_model.insert_paths(paths)
+        self.status_label.setText(f"Scanning the library... {len(self.files)} mods")
+
+    def scan_finished(self, report):
+        self.scanning = False
+        self.rescan_button.setEnabled(True)
+        if report.removed or report.added:
+            self.show_files(self.library.files())
+        self.status_label.setText(report.summary())
+
+    def scan_failed(self, error):
+        self.scanning = False
+        self.rescan_button.setEnabled(True)
+        self.status_label.setText(f"Could not scan the library: {str(error)}")
+
+    def show_files(self, files):
+        self.files = sorted(files, key=str.lower)
+        self.files_version += 1
+        self.filter_files()
+        self.status_label.setText(f"{len(self.files)} mods in the library.")
+        self.build_library_index()
+
+    def library_index_entries(self):
+        return {path: (os.path.basename(path), path) for path in self.files}
+
+    def build_library_index(self):
+        version = self.files_version
+        run_in_background(
+            build_index, self.library_index_entries(),
+            callback=lambda index: self.library_index_built(index, version)
+        )
+
+    def library_index_built(self, index, version):
+        if self.library_index_version is None or self.library_index_version < version:
+            self.library_index = index
+            self.library_index_version = version
+            if self.search_input.text().strip():
+                self.filter_files()
+
+    def filter_files(self):
+        query = self.search_input.text()
+        if not query.strip():
+            self.library_model.set_paths(self.files)
+            return
+        if self.library_index_version != self.files_version:
+            self.library_index.sync(self.library_index_entries())
+            self.library_index_version = self.files_version
+        self.library_model.set_paths(self.library_index.search(query))
+
+    def add_selected(self):
+        rows = sorted(index.row() for index in self.files_view.selectionModel().selectedRows())
+        self.add_to_mods([self.library_model.path(row) for row in rows])
+
+    def add_to_mods(self, paths):
+        if paths:
+            self.shell.page(self.mods_page).mod_model.insert_paths(paths)
+            self.status_label.setText(f"Added {len(paths)} mods to the list.")
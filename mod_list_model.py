@@ -0,0 +1,175 @@
+import os
+from array import array
+from bisect import bisect_left
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QStringListModel
+
+
+class ModListModel(QAbstractListModel):
+    # Paths are stored as an interned directory id plus a file name, and the
+    # display text is only produced when the view asks for a visible row.
+    # The rows of each path are looked up through a table that is rebuilt
+    # on the first lookup after an edit.
+    def __init__(self, paths=(), parent=None):
+        super().__init__(parent)
+        self.directories = []
+        self.directory_ids = {}
+        self.entry_directories = array("I")
+        self.entry_names = []
+        self.path_rows = None
+        self.duplicate_rows = {}
+        self.append_entries(paths)
+
+    def intern_directory(self, directory):
+        directory_id = self.directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = len(self.directories)
+            self.directories.append(directory)
+            self.directory_ids[directory] = directory_id
+        return directory_id
+
+    def split_path(self, path):
+        name = os.path.basename(path)
+        return self.intern_directory(path[:len(path) - len(name)]), name
+
+    def append_entries(self, paths, row=None):
+        row = len(self.entry_names) if row is None else row
+        directory_ids, names = [], []
+        for path in paths:
+            directory_id, name = self.split_path(path)
+            directory_ids.append(directory_id)
+            names.append(name)
+        self.entry_directories[row:row] = array("I", directory_ids)
+        self.entry_names[row:row] = names
+        self.path_rows = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entry_names)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.entry_names[row]
+        if role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.UserRole):
+            return self.path(row)
+        return None
+
+    def path(self, row):
+        return self.directories[self.entry_directories[row]] + self.entry_names[row]
+
+    def paths(self):
+        directories = self.directories
+        return [directories[directory_id] + name for directory_id, name in zip(self.entry_directories, self.entry_names)]
+
+    def rows(self, paths):
+        # The rows holding any of the paths, in load order. A mod listed
+        # more than once has all of its rows in a table of their own.
+        if self.path_rows is None:
+            entry_paths = self.paths()
+            self.path_rows = dict(zip(entry_paths, range(len(entry_paths))))
+            self.duplicate_rows = {}
+            if len(self.path_rows) < len(entry_paths):
+                for row, path in enumerate(entry_paths):
+                    if self.path_rows[path] != row:
+                        self.duplicate_rows.setdefault(path, []).append(row)
+                for path, rows in self.duplicate_rows.items():
+                    rows.append(self.path_rows[path])
+        lookup = self.path_rows.get
+        if self.duplicate_rows:
+            rows = [row for path in paths for row in self.duplicate_rows.get(path, (lookup(path),))]
+        else:
+            rows = list(map(lookup, paths))
+        return sorted(row for row in rows if row is not None)
+
+    def set_paths(self, paths):
+        self.beginResetModel()
+        self.directories = []
+        self.directory_ids = {}
+        self.entry_directories = array("I")
+        self.entry_names = []
+        self.append_entries(paths)
+        self.endResetModel()
+
+    def insert_paths(self, paths, row=None):
+        paths = list(paths)
+        if not paths:
+            return
+        row = len(self.entry_names) if row is None else row
+        self.beginInsertRows(QModelIndex(), row, row + len(paths) - 1)
+        self.append_entries(paths, row)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        # Contiguous runs are removed with one notification each, from the
+        # bottom up so earlier row numbers stay valid.
+        ranges = []
+        for row in sorted(set(rows), reverse=True):
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1][0] = row
+            else:
+                ranges.append([row, row])
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.entry_directories[first:last + 1]
+            del self.entry_names[first:last + 1]
+            self.path_rows = None
+            self.endRemoveRows()
+
+    def move_row(self, source, destination):
+        if source == destination or not (0 <= destination < len(self.entry_names)):
+            return False
+        # Qt expects the destination as the row the item is inserted before.
+        self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), destination + 1 if destination > source else destination)
+        directory_id = self.entry_directories.pop(source)
+        name = self.entry_names.pop(source)
+        self.entry_directories.insert(destination, directory_id)
+        self.entry_names.insert(destination, name)
+        self.path_rows = None
+        self.endMoveRows()
+        return True
+
+
+class FilteredModList(QStringListModel):
+    # What the view shows of a ModListModel: every row, or the rows matching
+    # a search, in load order. The names are handed to Qt as one string list,
+    # so laying out the view does not call back into Python for every row.
+    # Edits to the mods leave it stale until the rows are set again.
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.source_rows = array("I")
+        self.stale = False
+        for signal in (source.rowsAboutToBeInserted, source.rowsAboutToBeRemoved, source.rowsAboutToBeMoved, source.modelAboutToBeReset):
+            signal.connect(self.mark_stale)
+
+    def mark_stale(self, *args):
+        self.stale = True
+
+    def set_rows(self, rows=None):
+        names = self.source.entry_names
+        if rows is None:
+            self.source_rows = array("I", range(len(names)))
+            self.setStringList(names)
+        else:
+            self.source_rows = array("I", rows)
+            self.setStringList([names[row] for row in rows])
+        self.stale = False
+
+    def source_row(self, row):
+        return self.source_rows[row]
+
+    def row_of(self, source_row):
+        row = bisect_left(self.source_rows, source_row)
+        return row if row < len(self.source_rows) and self.source_rows[row] == source_row else None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.UserRole):
+            return None if self.stale or not index.isValid() else self.source.path(self.source_rows[index.row()])
+        return super().data(index, role)
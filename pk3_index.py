@@ -0,0 +1,240 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import threading
+import zlib
+from array import array
+
+from storage import cache_path, atomic_write_bytes
+
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sHHHHIIH")
+ZIP64_LOCATOR = struct.Struct("<4sIQI")
+ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sQHHIIQQQQ")
+CENTRAL_DIRECTORY_ENTRY = struct.Struct("<4sHHHHHHIIIHHHHHII")
+LOCAL_FILE_HEADER = struct.Struct("<4sHHHHHIIIHH")
+EXTRA_FIELD_HEADER = struct.Struct("<HH")
+CACHE_HEADER = struct.Struct("<8sQqIQH")
+CACHE_MAGIC = b"MPK3IDX1"
+MAX_COMMENT = 0xFFFF
+UTF8_FLAG = 0x800
+ZIP64_EXTRA = 0x0001
+STORED = 0
+DEFLATED = 8
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class Pk3Index:
+    kind = "pk3"
+
+    def __init__(self, path, size, mtime_ns, names, name_offsets, flags, methods, crcs, compressed_sizes, sizes, offsets):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.name_data = names
+        self.name_offsets = name_offsets
+        self.flags = flags
+        self.methods = methods
+        self.crcs = crcs
+        self.compressed_sizes = compressed_sizes
+        self.sizes = sizes
+        self.offsets = offsets
+        self.lookup = None
+
+    def __len__(self):
+        return len(self.crcs)
+
+    def entry_size(self, index):
+        return self.sizes[index]
+
+    def name(self, index):
+        raw = self.name_data[self.name_offsets[index]:self.name_offsets[index + 1]]
+        return raw.decode("utf-8" if self.flags[index] & UTF8_FLAG else "cp437", "replace")
+
+    def names(self):
+        return [self.name(index) for index in range(len(self))]
+
+    def find(self, name):
+        if self.lookup is None:
+            self.lookup = {entry_name.lower(): index for index, entry_name in enumerate(self.names())}
+        return self.lookup.get(name.lower())
+
+    def to_bytes(self):
+        path = self.path.encode("utf-8")
+        parts = [
+            CACHE_HEADER.pack(CACHE_MAGIC, self.size, self.mtime_ns, len(self), len(self.name_data), len(path)),
+            path, self.name_data
+        ]
+        for table in self.tables():
+            parts.append(table.tobytes())
+        return b"".join(parts)
+
+    def tables(self):
+        return (self.name_offsets, self.flags, self.methods, self.crcs, self.compressed_sizes, self.sizes, self.offsets)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, size, mtime_ns, count, names_length, path_length = CACHE_HEADER.unpack_from(data)
+        if magic != CACHE_MAGIC:
+            raise ArchiveError("Not a pk3 index cache file")
+        position = CACHE_HEADER.size
+        path = data[position:position + path_length].decode("utf-8")
+        position += path_length
+        names = data[position:position + names_length]
+        position += names_length
+        tables = []
+        for typecode, length in (("I", count + 1), ("H", count), ("H", count), ("I", count), ("Q", count), ("Q", count), ("Q", count)):
+            table = array(typecode)
+            end = position + table.itemsize * length
+            table.frombytes(data[position:end])
+            tables.append(table)
+            position = end
+        return cls(path, size, mtime_ns, names, *tables)
+
+
+def find_central_directory(view, file_size):
+    search_start = max(0, file_size - END_OF_CENTRAL_DIRECTORY.size - MAX_COMMENT)
+    eocd_offset = view.rfind(b"PK\x05\x06", search_start)
+    if eocd_offset < 0:
+        raise ArchiveError("End of central directory not found")
+    _, _, _, _, count, directory_size, directory_offset, _ = END_OF_CENTRAL_DIRECTORY.unpack_from(view, eocd_offset)
+
+    if count == 0xFFFF or directory_size == 0xFFFFFFFF or directory_offset == 0xFFFFFFFF:
+        locator_offset = eocd_offset - ZIP64_LOCATOR.size
+        if locator_offset < 0:
+            raise ArchiveError("Truncated zip64 locator")
+        signature, _, zip64_offset, _ = ZIP64_LOCATOR.unpack_from(view, locator_offset)
+        if signature != b"PK\x06\x07":
+            raise ArchiveError("Missing zip64 locator")
+        fields = ZIP64_END_OF_CENTRAL_DIRECTORY.unpack_from(view, zip64_offset)
+        if fields[0] != b"PK\x06\x06":
+            raise ArchiveError("Missing zip64 end of central directory")
+        count, directory_size, directory_offset = fields[7], fields[8], fields[9]
+
+    if directory_offset + directory_size > file_size:
+        raise ArchiveError("Central directory lies outside the file")
+    return count, directory_offset
+
+
+def read_zip64_extra(view, position, length, sizes):
+    # Only the fields saturated in the fixed header are present, in this order.
+    end = position + length
+    while position + EXTRA_FIELD_HEADER.size <= end:
+        header_id, data_size = EXTRA_FIELD_HEADER.unpack_from(view, position)
+        position += EXTRA_FIELD_HEADER.size
+        if header_id == ZIP64_EXTRA:
+            values = list(sizes)
+            field = position
+            for slot in range(3):
+                if values[slot] == 0xFFFFFFFF and field + 8 <= position + data_size:
+                    values[slot] = struct.unpack_from("<Q", view, field)[0]
+                    field += 8
+            return values
+        position += data_size
+    return sizes
+
+
+def read_pk3_index(path):
+    stat = os.stat(path)
+    names = bytearray()
+    name_offsets = array("I", [0])
+    flags, methods = array("H"), array("H")
+    crcs = array("I")
+    compressed_sizes, sizes, offsets = array("Q"), array("Q"), array("Q")
+
+    with open(path, 'rb') as file:
+        if stat.st_size < END_OF_CENTRAL_DIRECTORY.size:
+            raise ArchiveError(f"{path} is too small to be a zip archive")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            count, position = find_central_directory(view, stat.st_size)
+            for _ in range(count):
+                (signature, _, _, flag, method, _, _, crc, compressed_size, size,
+                 name_length, extra_length, comment_length, _, _, _, offset) = CENTRAL_DIRECTORY_ENTRY.unpack_from(view, position)
+                if signature != b"PK\x01\x02":
+                    raise ArchiveError(f"Corrupt central directory in {path}")
+                name_start = position + CENTRAL_DIRECTORY_ENTRY.size
+                name = view[name_start:name_start + name_length]
+                if 0xFFFFFFFF in (compressed_size, size, offset):
+                    size, compressed_size, offset = read_zip64_extra(view, name_start + name_length, extra_length, (size, compressed_size, offset))
+                position = name_start + name_length + extra_length + comment_length
+                if name.endswith(b"/"):
+                    continue
+                names += name
+                name_offsets.append(len(names))
+                flags.append(flag)
+                methods.append(method)
+                crcs.append(crc)
+                compressed_sizes.append(compressed_size)
+                sizes.append(size)
+                offsets.append(offset)
+
+    return Pk3Index(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, bytes(names), name_offsets, flags, methods, crcs, compressed_sizes, sizes, offsets)
+
+
+def read_entry(index, entry):
+    # Only this entry's bytes are read: the local header is consulted for the
+    # length of its name and extra field, then the data is inflated directly.
+    compressed_size = index.compressed_sizes[entry]
+    with open(index.path, 'rb') as file:
+        file.seek(index.offsets[entry])
+        header = file.read(LOCAL_FILE_HEADER.size)
+        if len(header) < LOCAL_FILE_HEADER.size or header[:4] != b"PK\x03\x04":
+            raise ArchiveError(f"Corrupt local header for {index.name(entry)} in {index.path}")
+        name_length, extra_length = LOCAL_FILE_HEADER.unpack(header)[9:]
+        file.seek(name_length + extra_length, os.SEEK_CUR)
+        data = file.read(compressed_size)
+    if len(data) < compressed_size:
+        raise ArchiveError(f"{index.name(entry)} is truncated in {index.path}")
+
+    method = index.methods[entry]
+    if method == DEFLATED:
+        try:
+            data = zlib.decompress(data, -zlib.MAX_WBITS, index.sizes[entry])
+        except zlib.error as e:
+            raise ArchiveError(f"Could not inflate {index.name(entry)} in {index.path}: {e}")
+    elif method != STORED:
+        raise ArchiveError(f"Unsupported compression method {method} for {index.name(entry)} in {index.path}")
+    if zlib.crc32(data) != index.crcs[entry]:
+        raise ArchiveError(f"CRC mismatch for {index.name(entry)} in {index.path}")
+    return data
+
+
+def index_cache_file(path):
+    return cache_path("pk3", hashlib.sha1(path.encode("utf-8")).hexdigest() + "." + sys.byteorder + ".idx")
+
+
+def load_cached_index(cache_file, path, size, mtime_ns):
+    try:
+        with open(cache_file, 'rb') as file:
+            index = Pk3Index.from_bytes(file.read())
+    except (OSError, ValueError, ArchiveError, struct.error):
+        return None
+    if (index.path, index.size, index.mtime_ns) != (path, size, mtime_ns):
+        return None
+    return index
+
+
+def index_pk3(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _indexes_lock:
+        cached = _indexes.get(path)
+    if cached is not None and (cached.size, cached.mtime_ns) == key:
+        return cached
+
+    cache_file = index_cache_file(path)
+    index = load_cached_index(cache_file, path, *key)
+    if index is None:
+        index = read_pk3_index(path)
+        atomic_write_bytes(cache_file, index.to_bytes())
+    with _indexes_lock:
+        _indexes[path] = index
+    return index
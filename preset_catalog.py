@@ -0,0 +1,196 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config_manager import get_config_manager
+from tracing import span, traced
+
+PRESET_DIR = "."
+PRESET_DATABASE = "presets.db"
+NON_PRESET_FILES = {"config.json", "necessary.json"}
+SCHEMA_VERSION = 1
+SCHEMA = """
+    CREATE TABLE paths (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE presets (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        revision INTEGER NOT NULL
+    );
+    CREATE TABLE preset_mods (
+        preset_id INTEGER NOT NULL REFERENCES presets (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        path_id INTEGER NOT NULL REFERENCES paths (id),
+        PRIMARY KEY (preset_id, position)
+    ) WITHOUT ROWID;
+"""
+
+
+def is_preset(value):
+    return isinstance(value, list) and all(isinstance(path, str) for path in value)
+
+
+def legacy_presets(directory):
+    # Before the database, every preset was a JSON list of paths saved next
+    # to the program, and config.json carried an unused "presets" dict.
+    presets = {}
+    stored = get_config_manager().config.get("presets")
+    if isinstance(stored, dict):
+        presets.update((name, paths) for name, paths in stored.items() if is_preset(paths))
+    with os.scandir(directory) as scan:
+        for entry in sorted(scan, key=lambda entry: entry.name):
+            if not entry.name.endswith(".json") or entry.name in NON_PRESET_FILES or not entry.is_file():
+                continue
+            try:
+                with open(entry.path, 'r') as preset_file:
+                    paths = json.load(preset_file)
+            except (OSError, ValueError):
+                continue
+            if is_preset(paths):
+                presets[os.path.splitext(entry.name)[0]] = paths
+    return presets
+
+
+class PresetCatalog:
+    # Presets live in one SQLite file: names are indexed case-insensitively
+    # and mod paths are interned, so a preset is a list of path ids. entries
+    # maps every name to its revision, which changes on each save.
+    def __init__(self, database=PRESET_DATABASE, directory=PRESET_DIR):
+        self.database = database
+        self.directory = directory
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(database, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.data_version = None
+        self.stale = True
+        self.entries = {}
+        self.migrate()
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def migrate(self):
+        with self.transaction() as connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+            # The first run brings the old JSON presets along, in the same
+            # transaction, so an interrupted import is simply redone.
+            with span("catalog.import"):
+                for name, pk3_files in legacy_presets(self.directory).items():
+                    self.write(connection, name, pk3_files)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @traced("catalog.refresh")
+    def refresh(self):
+        # data_version only moves when another connection commits, and saves
+        # made through this one mark the catalog stale themselves.
+        with self.lock:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self.data_version and not self.stale:
+                return False
+            entries = dict(self.connection.execute("SELECT name, revision FROM presets"))
+            self.data_version = data_version
+            self.stale = False
+            changed = entries != self.entries
+            self.entries = entries
+            return changed
+
+    def preset_names(self):
+        with self.lock:
+            return [name for name, in self.connection.execute("SELECT name FROM presets ORDER BY name")]
+
+    def find(self, name):
+        with self.lock:
+            row = self.connection.execute("SELECT name FROM presets WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    @traced("catalog.load")
+    def load(self, name):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT paths.path FROM presets"
+                " JOIN preset_mods ON preset_mods.preset_id = presets.id"
+                " JOIN paths ON paths.id = preset_mods.path_id"
+                " WHERE presets.name = ? ORDER BY preset_mods.position",
+                (name,)
+            ).fetchall()
+            if not rows and self.find(name) is None:
+                raise LookupError(f"Unknown preset: {name}")
+        return [path for path, in rows]
+
+    def mod_paths(self):
+        # Every mod referenced by at least one preset, each listed once.
+        with self.lock:
+            return [path for path, in self.connection.execute("SELECT path FROM paths WHERE id IN (SELECT path_id FROM preset_mods)")]
+
+    @traced("catalog.save")
+    def save(self, name, pk3_files):
+        with self.transaction() as connection:
+            self.write(connection, name, pk3_files)
+            self.stale = True
+
+    @traced("catalog.delete")
+    def delete(self, name):
+        # The preset's mod list goes with it through ON DELETE CASCADE.
+        with self.transaction() as connection:
+            if connection.execute("DELETE FROM presets WHERE name = ?", (name,)).rowcount == 0:
+                raise LookupError(f"Unknown preset: {name}")
+            self.stale = True
+
+    @traced("catalog.rename")
+    def rename(self, name, new_name):
+        if not new_name:
+            raise ValueError("The new name is empty")
+        with self.transaction() as connection:
+            existing = connection.execute("SELECT name FROM presets WHERE name = ?", (new_name,)).fetchone()
+            # Names differing only in case are the same preset.
+            if existing is not None and existing[0].lower() != name.lower():
+                raise ValueError(f"A preset named {existing[0]} already exists")
+            updated = connection.execute(
+                "UPDATE presets SET name = ?, revision = revision + 1 WHERE name = ?", (new_name, name)
+            ).rowcount
+            if updated == 0:
+                raise LookupError(f"Unknown preset: {name}")
+            self.stale = True
+
+    def write(self, connection, name, pk3_files):
+        connection.execute(
+            "INSERT INTO presets (name, revision) VALUES (?, 1)"
+            " ON CONFLICT (name) DO UPDATE SET name = excluded.name, revision = revision + 1",
+            (name,)
+        )
+        preset_id = connection.execute("SELECT id FROM presets WHERE name = ?", (name,)).fetchone()[0]
+        connection.execute("DELETE FROM preset_mods WHERE preset_id = ?", (preset_id,))
+        connection.executemany("INSERT OR IGNORE INTO paths (path) VALUES (?)", ((path,) for path in pk3_files))
+        path_ids = [connection.execute("SELECT id FROM paths WHERE path = ?", (path,)).fetchone()[0] for path in pk3_files]
+        connection.executemany(
+            "INSERT INTO preset_mods (preset_id, position, path_id) VALUES (?, ?, ?)",
+            ((preset_id, position, path_id) for position, path_id in enumerate(path_ids))
+        )
+
+
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = PresetCatalog()
+        _catalog.refresh()
+    return _catalog
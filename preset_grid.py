@@ -0,0 +1,237 @@
+from PyQt6.QtWidgets import QListView, QMenu, QPushButton, QStyle, QStyledItemDelegate, QStyleOptionButton
+from PyQt6.QtCore import Qt, QAbstractListModel, QEvent, QModelIndex, QRectF, QSize, pyqtSignal
+from PyQt6.QtGui import QPainter, QPainterPath
+
+from shell import draw_scaled_pixmap
+
+CHUNK_SIZE = 200
+COLUMNS = 3
+TILE_HEIGHT = 56
+TILE_MARGIN = 4
+THUMBNAIL_WIDTH = 96
+THUMBNAIL_HEIGHT = 48
+THUMBNAIL_OPACITY = 0.6
+THUMBNAIL_RADIUS = 6
+
+
+class PresetListModel(QAbstractListModel):
+    # Rows are handed to the view in chunks through fetchMore, so a large
+    # catalog is laid out progressively as the user scrolls.
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.preset_names = []
+        self.rows = None
+        self.loaded = 0
+        self.tooltips = {}
+        self.thumbnails = {}
+        self.thumbnail_loader = None
+
+    def reload(self, preset_names=None):
+        self.beginResetModel()
+        self.preset_names = self.catalog.preset_names() if preset_names is None else list(preset_names)
+        self.rows = None
+        self.loaded = min(CHUNK_SIZE, len(self.preset_names))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.preset_names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(CHUNK_SIZE, len(self.preset_names) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        preset_name = self.preset_names[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return preset_name
+        if role == Qt.ItemDataRole.UserRole:
+            return preset_name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            # Long names are elided on the tile, so the tooltip always
+            # starts with the full one.
+            summary = self.tooltips.get(preset_name)
+            return f"{preset_name}\n{summary}" if summary else preset_name
+        if role == Qt.ItemDataRole.DecorationRole:
+            # Only painted tiles ask for their art, so thumbnails are loaded
+            # for what is on screen and arrive later through set_thumbnail.
+            if preset_name not in self.thumbnails and self.thumbnail_loader is not None:
+                self.thumbnails[preset_name] = None
+                self.thumbnail_loader(preset_name)
+            return self.thumbnails.get(preset_name)
+        return None
+
+    def set_tooltip(self, preset_name, text):
+        self.tooltips[preset_name] = text
+        self.notify(preset_name, Qt.ItemDataRole.ToolTipRole)
+
+    def set_thumbnail(self, preset_name, pixmap):
+        self.thumbnails[preset_name] = pixmap
+        self.notify(preset_name, Qt.ItemDataRole.DecorationRole)
+
+    def clear_thumbnails(self):
+        self.thumbnails = {}
+
+    def notify(self, preset_name, role):
+        if self.rows is None:
+            self.rows = {preset_name: row for row, preset_name in enumerate(self.preset_names)}
+        row = self.rows.get(preset_name)
+        if row is not None and row < self.loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [role])
+
+
+class PresetTileDelegate(QStyledItemDelegate):
+    # Tiles are painted with the push button rules of the active stylesheet,
+    # through one hidden template button, instead of one widget per preset.
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.template = QPushButton(view)
+        self.template.hide()
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.initFrom(self.template)
+        button.rect = option.rect.adjusted(TILE_MARGIN, TILE_MARGIN, -TILE_MARGIN, -TILE_MARGIN)
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            button.state |= QStyle.StateFlag.State_MouseOver
+        if option.state & QStyle.StateFlag.State_HasFocus:
+            button.state |= QStyle.StateFlag.State_HasFocus
+        style = self.template.style()
+        # The contents rectangle already excludes the stylesheet's padding and
+        # borders, so long names are elided instead of clipped.
+        contents = style.subElementRect(QStyle.SubElement.SE_PushButtonContents, button, self.template)
+        button.text = button.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, contents.width())
+        if self.view.tile_art is not None:
+            bevel = style.subElementRect(QStyle.SubElement.SE_PushButtonBevel, button, self.template)
+            draw_scaled_pixmap(painter, bevel, self.view.tile_art, self.view.devicePixelRatioF())
+        thumbnail = index.data(Qt.ItemDataRole.DecorationRole)
+        if thumbnail is None:
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, self.template)
+            return
+        # Title art goes between the button face and its label.
+        style.drawControl(QStyle.ControlElement.CE_PushButtonBevel, button, painter, self.template)
+        art = QRectF(button.rect.adjusted(2, 2, -2, -2))
+        clip = QPainterPath()
+        clip.addRoundedRect(art, THUMBNAIL_RADIUS, THUMBNAIL_RADIUS)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setClipPath(clip)
+        painter.setOpacity(THUMBNAIL_OPACITY)
+        painter.drawPixmap(art, thumbnail, QRectF(thumbnail.rect()))
+        painter.restore()
+        style.drawControl(QStyle.ControlElement.CE_PushButtonLabel, button, painter, self.template)
+
+    def sizeHint(self, option, index):
+        return self.view.gridSize()
+
+
+class PresetGridView(QListView):
+    preset_activated = pyqtSignal(str)
+    preset_hovered = pyqtSignal(str)
+    preset_rename_requested = pyqtSignal(str)
+    preset_delete_requested = pyqtSignal(str)
+
+    def __init__(self, model, parent=None, tile_art=None):
+        super().__init__(parent)
+        self.tile_art = tile_art
+        self.text_widths = {}
+        self.tile_width = 0
+        self.setModel(model)
+        self.setItemDelegate(PresetTileDelegate(self))
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(CHUNK_SIZE)
+        self.setUniformItemSizes(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setFrameShape(QListView.Shape.NoFrame)
+        self.setStyleSheet("QListView { border: none; background: transparent; }")
+        self.clicked.connect(self.activate)
+        self.entered.connect(self.hover)
+        self.selectionModel().currentChanged.connect(lambda current, previous: self.hover(current))
+        model.modelReset.connect(self.update_tile_width)
+        self.update_tile_width()
+
+    def activate(self, index):
+        if index.isValid():
+            self.preset_activated.emit(index.data(Qt.ItemDataRole.UserRole))
+
+    def hover(self, index):
+        if index.isValid():
+            self.preset_hovered.emit(index.data(Qt.ItemDataRole.UserRole))
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Space):
+            self.activate(self.currentIndex())
+            return
+        if event.key() == Qt.Key.Key_Delete and self.currentIndex().isValid():
+            self.preset_delete_requested.emit(self.currentIndex().data(Qt.ItemDataRole.UserRole))
+            return
+        if event.key() == Qt.Key.Key_F2 and self.currentIndex().isValid():
+            self.preset_rename_requested.emit(self.currentIndex().data(Qt.ItemDataRole.UserRole))
+            return
+        super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            return
+        preset_name = index.data(Qt.ItemDataRole.UserRole)
+        menu = QMenu(self)
+        menu.addAction("Rename", lambda: self.preset_rename_requested.emit(preset_name))
+        menu.addAction("Delete", lambda: self.preset_delete_requested.emit(preset_name))
+        menu.exec(event.globalPos())
+
+    def update_tile_width(self):
+        # Tiles are made wide enough for the longest name in the model, with
+        # the stylesheet's padding, borders and margins around it; fewer
+        # columns are used when up to COLUMNS of them do not fit.
+        template = self.itemDelegate().template
+        template.ensurePolished()
+        metrics = template.fontMetrics()
+        text_width = 0
+        for preset_name in self.model().preset_names:
+            width = self.text_widths.get(preset_name)
+            if width is None:
+                width = self.text_widths[preset_name] = metrics.horizontalAdvance(preset_name)
+            text_width = max(text_width, width)
+        option = QStyleOptionButton()
+        option.initFrom(template)
+        size = template.style().sizeFromContents(QStyle.ContentsType.CT_PushButton, option, QSize(text_width, metrics.height()), template)
+        self.tile_width = size.width() + 2 * TILE_MARGIN
+        self.update_grid()
+
+    def update_grid(self):
+        # The view wraps as if its scroll bar were always shown, and only
+        # when the cells are narrower than what is left, so both are
+        # subtracted here.
+        width = self.viewport().width() - 1
+        scroll_bar = self.verticalScrollBar()
+        if not scroll_bar.isVisible():
+            width -= scroll_bar.sizeHint().width()
+        columns = max(1, min(COLUMNS, width // max(1, self.tile_width)))
+        self.setGridSize(QSize(width // columns, TILE_HEIGHT))
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self.text_widths = {}
+            self.update_tile_width()
+        super().changeEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_grid()
@@ -0,0 +1,147 @@
+import json
+
+from PyQt6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtGui import QAction
+from PyQt6.QtNetwork import QAbstractSocket, QLocalServer
+
+from config_manager import get_config_manager
+from cli import find_preset
+from instance import is_running, server_name
+from preset_catalog import get_catalog
+from tracing import mark
+
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+class InstanceServer(QObject):
+    # Takes the commands of later invocations of the program (see
+    # instance.forward). Requests that arrive while the window is still
+    # being built are kept until a handler is set.
+    def __init__(self, name=None, parent=None):
+        super().__init__(parent)
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        self.handler = None
+        self.pending = []
+        self.buffers = {}
+
+    def listen(self):
+        listening = self.server.listen(self.name)
+        if not listening and self.server.serverError() == QAbstractSocket.SocketError.AddressInUseError and not is_running():
+            # Left behind by an instance that did not exit cleanly.
+            QLocalServer.removeServer(self.name)
+            listening = self.server.listen(self.name)
+        if listening:
+            QApplication.instance().aboutToQuit.connect(self.server.close)
+        return listening
+
+    def set_handler(self, handler):
+        self.handler = handler
+        pending, self.pending = self.pending, []
+        for request in pending:
+            handler(request)
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.buffers[connection] = b""
+            connection.readyRead.connect(lambda connection=connection: self.read(connection))
+            connection.disconnected.connect(lambda connection=connection: self.drop(connection))
+
+    def read(self, connection):
+        data = self.buffers.get(connection, b"") + bytes(connection.readAll())
+        if b"\n" not in data:
+            if len(data) > MAX_REQUEST_BYTES:
+                connection.abort()
+            else:
+                self.buffers[connection] = data
+            return
+        try:
+            request = json.loads(data.split(b"\n", 1)[0])
+        except ValueError:
+            request = None
+        accepted = isinstance(request, dict) and request.get("command") in ("ping", "show", "preset")
+        if accepted and request["command"] == "preset":
+            # Answered only once the preset is known to exist, so the
+            # launching process can still fail the way the command line does.
+            accepted = find_preset(get_catalog(), str(request.get("name"))) is not None
+        connection.write(b"ok\n" if accepted else b"error\n")
+        connection.disconnectFromServer()
+        if accepted and request["command"] != "ping":
+            mark("instance.request", command=request["command"])
+            if self.handler is None:
+                self.pending.append(request)
+            else:
+                self.handler(request)
+
+    def drop(self, connection):
+        self.buffers.pop(connection, None)
+        connection.deleteLater()
+
+
+def show_window(shell):
+    if shell.isMinimized():
+        shell.showNormal()
+    shell.show()
+    shell.raise_()
+    shell.activateWindow()
+
+
+def handle_request(shell, request):
+    if request["command"] == "preset":
+        shell.page("presets").run_forwarded_preset(
+            str(request.get("name")), bool(request.get("bundle")), bool(request.get("response_file"))
+        )
+    else:
+        show_window(shell)
+
+
+class ResidentTray(QObject):
+    # With "resident" set, closing the window only hides it: the program
+    # stays in the system tray with its pages built and its caches warm, and
+    # the next launch just shows it again.
+    def __init__(self, shell):
+        super().__init__(shell)
+        self.shell = shell
+        self.quitting = False
+        self.menu = QMenu()
+        show_action = QAction("Show", self.menu)
+        show_action.triggered.connect(lambda: show_window(self.shell))
+        quit_action = QAction("Quit", self.menu)
+        quit_action.triggered.connect(self.quit)
+        self.menu.addAction(show_action)
+        self.menu.addAction(quit_action)
+        self.tray = QSystemTrayIcon(shell.windowIcon(), self)
+        self.tray.setToolTip("MOOD SELECTOR")
+        self.tray.setContextMenu(self.menu)
+        self.tray.activated.connect(self.activated)
+        shell.installEventFilter(self)
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+        self.tray.show()
+
+    def activated(self, reason):
+        if reason == QSystemTrayIcon.ActivationReason.Trigger:
+            show_window(self.shell)
+
+    def quit(self):
+        self.quitting = True
+        QApplication.instance().quit()
+
+    def eventFilter(self, watched, event):
+        if watched is self.shell and event.type() == QEvent.Type.Close and not self.quitting:
+            event.ignore()
+            self.shell.hide()
+            return True
+        return super().eventFilter(watched, event)
+
+
+def make_resident(shell, server):
+    # Later launches are handed to this window; the tray is optional and
+    # needs a desktop that has one.
+    server.set_handler(lambda request: handle_request(shell, request))
+    if get_config_manager().config.get("resident") and QSystemTrayIcon.isSystemTrayAvailable():
+        shell.tray = ResidentTray(shell)
+    return shell
@@ -0,0 +1,235 @@
+import re
+import heapq
+from array import array
+from collections import Counter
+
+from tracing import traced
+
+SEPARATORS = re.compile(r"[\W_]+")
+RESULT_LIMIT = 500
+COMPACT_MIN = 1024
+FUZZY_RATIO = 0.5
+EMPTY = array("I")
+
+
+def normalize(text):
+    return SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def word_grams(text):
+    # Words are indexed with a leading space, so " b" and " br" mark word
+    # starts and every other gram is a trigram inside a single word.
+    grams = set()
+    for word in text.split():
+        word = " " + word
+        grams.add(word[:2])
+        for i in range(len(word) - 2):
+            grams.add(word[i:i + 3])
+    return grams
+
+
+def query_needles(tokens):
+    # Tokens shorter than a trigram only match at the start of a word.
+    return [token if len(token) >= 3 else " " + token for token in tokens]
+
+
+def needle_grams(needle):
+    if needle[0] == " ":
+        return [needle]
+    return [needle[i:i + 3] for i in range(len(needle) - 2)]
+
+
+class SearchIndex:
+    # Entries get a dense integer id; each gram maps to an array of the ids
+    # containing it. Removed entries are left as empty tombstones and the
+    # tables are rebuilt once they outnumber the live entries.
+    def __init__(self):
+        self.keys = []
+        self.names = []
+        self.texts = []
+        self.ids = {}
+        self.sources = {}
+        self.postings = {}
+        self.name_postings = {}
+        self.removed = 0
+        self.last = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def add(self, key, name, path=None):
+        if key in self.ids:
+            self.remove(key)
+        name_text = " " + normalize(name)
+        text = name_text if path is None else name_text + " " + normalize(path)
+        self.append(key, name_text, text)
+        self.sources[key] = (name, path)
+        self.last = None
+
+    def append(self, key, name_text, text):
+        entry_id = len(self.keys)
+        self.keys.append(key)
+        self.names.append(name_text)
+        self.texts.append(text)
+        self.ids[key] = entry_id
+        self.post(self.postings, word_grams(text), entry_id)
+        # Names get their own grams, plus "^"-marked grams for how the name
+        # starts, so ranking can pull the best matches straight from them.
+        name_grams = word_grams(name_text)
+        name_grams.update(("^" + name_text[:2], "^" + name_text[:3]))
+        self.post(self.name_postings, name_grams, entry_id)
+
+    def post(self, postings, grams, entry_id):
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("I")
+            posting.append(entry_id)
+
+    def remove(self, key):
+        entry_id = self.ids.pop(key, None)
+        if entry_id is None:
+            return
+        del self.sources[key]
+        self.keys[entry_id] = None
+        self.names[entry_id] = ""
+        self.texts[entry_id] = ""
+        self.removed += 1
+        self.last = None
+        if self.removed > COMPACT_MIN and self.removed > len(self.ids):
+            self.compact()
+
+    def compact(self):
+        entries = [(key, name, text) for key, name, text in zip(self.keys, self.names, self.texts) if key is not None]
+        self.keys, self.names, self.texts = [], [], []
+        self.ids, self.postings, self.name_postings = {}, {}, {}
+        self.removed = 0
+        for key, name_text, text in entries:
+            self.append(key, name_text, text)
+
+    def sync(self, entries):
+        # entries maps key -> (name, path); only keys that appeared, vanished
+        # or changed touch the index.
+        for key in [key for key in self.ids if key not in entries]:
+            self.remove(key)
+        for key, source in entries.items():
+            if self.sources.get(key) != source:
+                self.add(key, *source)
+
+    @traced("search.query")
+    def search(self, query, limit=RESULT_LIMIT):
+        tokens = normalize(query).split()
+        if not tokens:
+            return []
+        needles = query_needles(tokens)
+        entry_ids = self.matches(needles)
+        if entry_ids:
+            ranked = self.rank(entry_ids, needles, limit)
+        else:
+            ranked = self.approximate(needles, limit)
+        return [self.keys[entry_id] for entry_id in ranked]
+
+    @traced("search.select")
+    def select(self, query):
+        # Every entry matching the query, unranked, and the best of them; for
+        # callers that show all matches in an order of their own.
+        tokens = normalize(query).split()
+        if not tokens:
+            return [], None
+        needles = query_needles(tokens)
+        entry_ids = self.matches(needles)
+        if entry_ids:
+            best = self.rank(entry_ids, needles, 1)
+        else:
+            entry_ids = best = self.approximate(needles, None)
+        keys = self.keys
+        return [keys[entry_id] for entry_id in entry_ids], keys[best[0]] if best else None
+
+    def matches(self, needles):
+        # While the user keeps typing, every new match set is a subset of the
+        # previous one, so only those entries are re-checked.
+        last = self.last
+        texts = self.texts
+        remaining = needles
+        if last is not None and len(needles) >= len(last[0]) and all(old in new for old, new in zip(last[0], needles)):
+            candidates = last[1]
+        else:
+            # Start from the rarest gram; a needle that is that gram itself
+            # is matched by construction and only tombstones need dropping.
+            # Every other needle, including the one the gram came from, is
+            # still checked against the text.
+            postings = [(self.postings.get(gram, EMPTY), gram, needle) for needle in needles for gram in needle_grams(needle)]
+            candidates, gram, needle = min(postings, key=lambda posting: len(posting[0]))
+            remaining = [other for other in needles if other != needle] if needle == gram else needles
+            candidates = [entry_id for entry_id in candidates if texts[entry_id]] if self.removed else list(candidates)
+        for needle in remaining:
+            candidates = [entry_id for entry_id in candidates if needle in texts[entry_id]]
+        self.last = (needles, candidates)
+        return candidates
+
+    def rank(self, entry_ids, needles, limit):
+        if len(needles) == 1:
+            return self.rank_tiers(entry_ids, needles[0], limit)
+        # Each needle scores 0 when the name starts with it, 1 at a word start
+        # in the name, 2 anywhere in the name and 3 when only the path has it.
+        # Equal scores keep index order, so no string comparisons are needed.
+        names = self.names
+        matched = [names[entry_id] for entry_id in entry_ids]
+        scores = [0] * len(matched)
+        for needle in needles:
+            word = needle if needle[0] == " " else " " + needle
+            scores = [score + (0 if name.startswith(word) else 1 if word in name else 2 if needle in name else 3) for score, name in zip(scores, matched)]
+        order = sorted(range(len(scores)), key=scores.__getitem__)
+        if limit is not None:
+            order = order[:limit]
+        return [entry_ids[position] for position in order]
+
+    def rank_tiers(self, entry_ids, needle, limit):
+        # The same order for a single needle, but each tier is read from the
+        # name grams and the scan stops once enough results are ranked, so a
+        # query matching most of the index does not score every entry.
+        names = self.names
+        name_postings = self.name_postings
+        word = needle if needle[0] == " " else " " + needle
+        matched = set(entry_ids)
+
+        def tiers():
+            yield (entry_id for entry_id in name_postings.get("^" + word[:3], EMPTY) if entry_id in matched and names[entry_id].startswith(word))
+            yield (entry_id for entry_id in name_postings.get(word[:3], EMPTY) if entry_id in matched and word in names[entry_id])
+            if needle[0] != " ":
+                posting = min((name_postings.get(gram, EMPTY) for gram in needle_grams(needle)), key=len)
+                yield (entry_id for entry_id in posting if entry_id in matched and needle in names[entry_id])
+            yield entry_ids
+
+        ranked = {}
+        for tier in tiers():
+            for entry_id in tier:
+                ranked[entry_id] = None
+                if len(ranked) == limit:
+                    return list(ranked)
+        return list(ranked)
+
+    def approximate(self, needles, limit):
+        # Nothing matched exactly: fall back to entries that share most of the
+        # query's grams, which tolerates a mistyped letter or two. Grams found
+        # in a large share of the index say little and are skipped.
+        common = max(1, len(self.ids) // 4)
+        postings = [self.postings.get(gram, EMPTY) for gram in word_grams(" ".join(needles))]
+        postings = [posting for posting in postings if len(posting) <= common]
+        counts = Counter()
+        for posting in postings:
+            counts.update(posting)
+        required = max(2, int(len(postings) * FUZZY_RATIO + 0.5))
+        names = self.names
+        ranked = [(-count, entry_id) for entry_id, count in counts.items() if count >= required and names[entry_id]]
+        ranked = sorted(ranked) if limit is None else heapq.nsmallest(limit, ranked)
+        return [entry_id for count, entry_id in ranked]
+
+
+def build_index(entries):
+    index = SearchIndex()
+    index.sync(entries)
+    return index
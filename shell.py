@@ -0,0 +1,144 @@
+from PyQt6.QtWidgets import QApplication, QStackedWidget, QPushButton, QStyle, QStyleOptionButton
+from PyQt6.QtCore import Qt, QEvent
+from PyQt6.QtGui import QFontDatabase, QFont, QIcon, QPixmap, QPainter
+
+from tracing import span
+
+# Fonts and images are process-wide and keyed by their place in the theme
+# bundle: registering a font again would add another entry to the font
+# database on every window switch.
+_font_families = {}
+_pixmaps = {}
+_scaled_pixmaps = {}
+_icons = {}
+
+
+def register_font_data(key, data):
+    if key not in _font_families:
+        font_id = QFontDatabase.addApplicationFontFromData(data)
+        font_families = QFontDatabase.applicationFontFamilies(font_id)
+        _font_families[key] = font_families[0] if font_families else None
+
+
+def register_image(key, image):
+    if key not in _pixmaps:
+        _pixmaps[key] = QPixmap.fromImage(image)
+
+
+def load_font(theme, size=12):
+    if not theme.has("font"):
+        return None
+    register_font_data(theme.key("font"), theme.data("font"))
+    family = _font_families[theme.key("font")]
+    return QFont(family, size) if family else None
+
+
+def load_pixmap(theme, role):
+    if not theme.has(role):
+        return None
+    register_image(theme.key(role), theme.image(role))
+    return _pixmaps[theme.key(role)]
+
+
+def load_scaled_pixmap(pixmap, width, height, ratio=1.0):
+    # Backgrounds and button art are scaled once per size and device pixel
+    # ratio; every widget painting them shares the same pixmap.
+    key = (pixmap.cacheKey(), width, height, ratio)
+    if key not in _scaled_pixmaps:
+        with span("pixmap.scale", width=width, height=height, ratio=ratio):
+            scaled = pixmap.scaled(
+                round(width * ratio), round(height * ratio),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            scaled.setDevicePixelRatio(ratio)
+        _scaled_pixmaps[key] = scaled
+    return _scaled_pixmaps[key]
+
+
+def draw_scaled_pixmap(painter, rect, pixmap, ratio):
+    if rect.width() > 0 and rect.height() > 0:
+        painter.drawPixmap(rect.topLeft(), load_scaled_pixmap(pixmap, rect.width(), rect.height(), ratio))
+
+
+def load_icon(theme):
+    if not theme.has("icon"):
+        return QIcon()
+    key = theme.key("icon")
+    if key not in _icons:
+        _icons[key] = QIcon(load_pixmap(theme, "icon"))
+    return _icons[key]
+
+
+class WindowShell(QStackedWidget):
+    # The background is painted once by the shell behind whichever page is
+    # current, and button art is painted onto each page's buttons from the
+    # shared scaled pixmaps, so neither is decoded or scaled per widget. The
+    # theme's stylesheet is set once here and every page inherits it.
+    def __init__(self, theme, width=400, height=500):
+        super().__init__()
+        self.page_factories = {}
+        self.pages = {}
+        self.theme = theme
+        self.background = load_pixmap(theme, "background")
+        self.button_art = load_pixmap(theme, "button_art")
+        self.setWindowIcon(load_icon(theme))
+        font = load_font(theme)
+        if font is not None:
+            # Pages and their widgets are built before they have a parent,
+            # so the theme's font is made the application default rather
+            # than left for them to inherit from the shell.
+            QApplication.setFont(font)
+            self.setFont(font)
+        self.setStyleSheet(theme.stylesheet)
+        self.setFixedSize(width, height)
+
+    def add_page(self, name, factory):
+        self.page_factories[name] = factory
+
+    def page(self, name):
+        if name not in self.pages:
+            with span("page.build", page=name):
+                page = self.page_factories[name](self)
+            # Themes style a single page through its name, e.g. "#presets QLabel".
+            page.setObjectName(name)
+            self.pages[name] = page
+            self.addWidget(page)
+            if self.button_art is not None:
+                for button in page.findChildren(QPushButton):
+                    button.installEventFilter(self)
+        return self.pages[name]
+
+    def show_page(self, name):
+        page = self.page(name)
+        self.setCurrentWidget(page)
+        self.setWindowTitle(page.windowTitle())
+        if hasattr(page, "page_shown"):
+            page.page_shown()
+        return page
+
+    def paintEvent(self, event):
+        if self.background is not None:
+            painter = QPainter(self)
+            draw_scaled_pixmap(painter, self.rect(), self.background, self.devicePixelRatioF())
+            painter.end()
+        super().paintEvent(event)
+
+    def eventFilter(self, watched, event):
+        # Art goes under the label: the stylesheet paints the button itself
+        # right after the filter returns.
+        if event.type() == QEvent.Type.Paint and isinstance(watched, QPushButton):
+            option = QStyleOptionButton()
+            watched.initStyleOption(option)
+            rect = watched.style().subElementRect(QStyle.SubElement.SE_PushButtonBevel, option, watched)
+            painter = QPainter(watched)
+            draw_scaled_pixmap(painter, rect, self.button_art, watched.devicePixelRatioF())
+            painter.end()
+        return super().eventFilter(watched, event)
+
+    def center_window(self):
+        screen = self.screen()
+        screen_rect = screen.availableGeometry()
+        self.move(
+            (screen_rect.width() - self.width()) // 2,
+            (screen_rect.height() - self.height()) // 2
+        )
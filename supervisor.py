@@ -0,0 +1,188 @@
+import os
+import time
+import codecs
+import logging
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPlainTextEdit, QPushButton
+from PyQt6.QtCore import QObject, QProcess, QElapsedTimer, pyqtSignal
+
+from tracing import mark, span
+
+LOG_DIR = "logs"
+LOG_FILE = "engine.log"
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 5
+OUTPUT_LINES = 2000
+HISTORY = 50
+
+
+class EngineRun:
+    def __init__(self, label, command, process):
+        self.label = label
+        self.command = command
+        self.process = process
+        self.started_at = time.time()
+        self.timer = QElapsedTimer()
+        self.timer.start()
+        self.output = deque(maxlen=OUTPUT_LINES)
+        # A character can be split across two reads, so bytes are decoded
+        # with the state of the previous read.
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.partial = ""
+        self.duration = None
+        self.exit_code = None
+        self.exit_status = None
+        self.error = None
+
+    @property
+    def running(self):
+        return self.duration is None
+
+    def describe(self):
+        started = time.strftime("%H:%M:%S", time.localtime(self.started_at))
+        if self.error is not None:
+            return f"{self.label}: failed to start at {started} ({self.error})"
+        if self.running:
+            return f"{self.label}: running since {started}"
+        return f"{self.label}: {self.exit_status} with code {self.exit_code} after {self.duration:.1f}s (started {started})"
+
+
+class EngineSupervisor(QObject):
+    run_started = pyqtSignal(object)
+    output_received = pyqtSignal(object, str)
+    run_finished = pyqtSignal(object)
+    run_failed = pyqtSignal(object, str)
+
+    def __init__(self):
+        super().__init__()
+        self.runs = deque(maxlen=HISTORY)
+        self.logger = logging.getLogger("mood.engine")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            handler = RotatingFileHandler(os.path.join(LOG_DIR, LOG_FILE), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+
+    def running(self):
+        return [run for run in self.runs if run.running]
+
+    def start(self, command, label):
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        run = EngineRun(label, command, process)
+        process.readyReadStandardOutput.connect(lambda: self.read_output(run))
+        process.finished.connect(lambda exit_code, exit_status: self.process_finished(run, exit_code, exit_status))
+        process.errorOccurred.connect(lambda error: self.process_error(run, error))
+        process.started.connect(lambda: mark("engine.running", label=label))
+        self.runs.append(run)
+        self.logger.info("[%s] starting: %s", label, " ".join(command))
+        with span("engine.start", label=label, files=len(command)):
+            process.start(command[0], command[1:])
+        self.run_started.emit(run)
+        return run
+
+    def read_output(self, run, final=False):
+        text = run.partial + run.decoder.decode(bytes(run.process.readAllStandardOutput()), final)
+        lines = text.split("\n")
+        run.partial = lines.pop()
+        for line in lines:
+            self.add_line(run, line.rstrip("\r"))
+
+    def add_line(self, run, line):
+        run.output.append(line)
+        self.logger.info("[%s] %s", run.label, line)
+        self.output_received.emit(run, line)
+
+    def process_finished(self, run, exit_code, exit_status):
+        self.read_output(run, final=True)
+        if run.partial:
+            self.add_line(run, run.partial)
+            run.partial = ""
+        run.duration = run.timer.elapsed() / 1000
+        run.exit_code = exit_code
+        run.exit_status = "crashed" if exit_status == QProcess.ExitStatus.CrashExit else "exited"
+        self.logger.info("[%s] %s with code %s after %.1fs", run.label, run.exit_status, exit_code, run.duration)
+        self.release(run)
+        self.run_finished.emit(run)
+
+    def process_error(self, run, error):
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        run.duration = run.timer.elapsed() / 1000
+        run.error = run.process.errorString()
+        self.logger.info("[%s] failed to start: %s", run.label, run.error)
+        self.release(run)
+        self.run_failed.emit(run, run.error)
+
+    def release(self, run):
+        # The QProcess has been reaped; drop it so finished children do not
+        # pile up for the lifetime of the launcher.
+        run.process.deleteLater()
+        run.process = None
+
+
+class EngineLogPage(QWidget):
+    def __init__(self, shell, supervisor, back_page="presets"):
+        super().__init__()
+        self.shell = shell
+        self.supervisor = supervisor
+        self.back_page = back_page
+        self.run = None
+        self.init_ui()
+        supervisor.run_started.connect(self.show_run)
+        supervisor.output_received.connect(self.append_output)
+        supervisor.run_finished.connect(self.update_status)
+        supervisor.run_failed.connect(self.update_status)
+
+    def init_ui(self):
+        self.setWindowTitle("Engine Log")
+        self.setFixedSize(400, 500)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(50, 50, 50, 50)
+
+        self.status_label = QLabel("No engine runs yet.")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        self.output_view = QPlainTextEdit()
+        self.output_view.setReadOnly(True)
+        self.output_view.setMaximumBlockCount(OUTPUT_LINES)
+        layout.addWidget(self.output_view)
+
+        self.back_button = QPushButton("Back")
+        self.back_button.clicked.connect(lambda: self.shell.show_page(self.back_page))
+        layout.addWidget(self.back_button)
+
+        self.setLayout(layout)
+
+    def page_shown(self):
+        if self.run is None and self.supervisor.runs:
+            self.show_run(self.supervisor.runs[-1])
+
+    def show_run(self, run):
+        self.run = run
+        self.output_view.setPlainText("\n".join(run.output))
+        self.update_status(run)
+
+    def append_output(self, run, line):
+        if run is self.run:
+            self.output_view.appendPlainText(line)
+
+    def update_status(self, run, *args):
+        if run is self.run:
+            self.status_label.setText(run.describe())
+
+
+_supervisor = None
+
+
+def get_supervisor():
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = EngineSupervisor()
+    return _supervisor
@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+_executor = None
+_dispatcher = None
+
+
+class TaskDispatcher(QObject):
+    finished = pyqtSignal(object, object, object)
+    posted = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.finished.connect(self.dispatch)
+        self.posted.connect(self.deliver)
+
+    def deliver(self, callback, args):
+        callback(*args)
+
+    def dispatch(self, future, callback, error_callback):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if callback is not None:
+                callback(future.result())
+        elif error_callback is not None:
+            error_callback(error)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="mood")
+    return _executor
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = TaskDispatcher()
+    return _dispatcher
+
+
+def in_gui_thread(callback):
+    # Wraps callback so a worker can call it for partial results; the call is
+    # queued and runs on the event loop. Create the wrapper on the GUI thread.
+    dispatcher = get_dispatcher()
+    return lambda *args: dispatcher.posted.emit(callback, args)
+
+
+def run_in_background(function, *args, callback=None, error_callback=None):
+    # The dispatcher lives on the GUI thread, so the signal it receives from the
+    # worker is queued and the callbacks always run on the event loop.
+    dispatcher = get_dispatcher()
+    future = get_executor().submit(function, *args)
+    future.add_done_callback(lambda done: dispatcher.finished.emit(done, callback, error_callback))
+    return future
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_manager
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Caches live under .mood_cache and config.json is read from the working
+    # directory, so each test gets its own.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, "_config_manager", None)
+    return tmp_path
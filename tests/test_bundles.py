@@ -0,0 +1,55 @@
+import zipfile
+
+from bundles import BundleCache, plan_bundles, surviving_entries, write_bundle
+
+
+def make_pk3(path, entries):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+    return str(path)
+
+
+def bundle_contents(path):
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_later_archives_override_full_paths(workdir):
+    first = make_pk3(workdir / "a.pk3", {"textures/wall.png": b"old wall", "sounds/dsshotgn.ogg": b"shotgun"})
+    second = make_pk3(workdir / "b.pk3", {"textures/wall.png": b"new wall", "sprites/impa1.png": b"imp"})
+    groups = plan_bundles([first, second])
+    assert len(groups) == 1 and len(groups[0]) == 2
+    with open(workdir / "bundle.pk3", 'wb') as target:
+        write_bundle(target, surviving_entries(groups[0]))
+    assert bundle_contents(workdir / "bundle.pk3") == {
+        "sounds/dsshotgn.ogg": b"shotgun",
+        "textures/wall.png": b"new wall",
+        "sprites/impa1.png": b"imp",
+    }
+
+
+def test_short_name_collisions_split_groups(workdir):
+    first = make_pk3(workdir / "a.pk3", {"textures/brickwall_red.png": b"red", "sounds/pistol_fire1.ogg": b"fire1"})
+    second = make_pk3(workdir / "b.pk3", {"textures/brickwall_blue.png": b"blue", "sounds/pistol_fire2.ogg": b"fire2"})
+    third = make_pk3(workdir / "c.pk3", {"sprites/impa1.png": b"imp"})
+    groups = plan_bundles([first, second, third])
+    assert [[index.path for index in group] for group in groups] == [[first], [second, third]]
+
+
+def test_merged_lumps_split_groups(workdir):
+    first = make_pk3(workdir / "a.pk3", {"DECORATE": b"actor A {}"})
+    second = make_pk3(workdir / "b.pk3", {"decorate.txt": b"actor B {}"})
+    assert len(plan_bundles([first, second])) == 2
+
+
+def test_launch_files_keep_load_order(workdir):
+    first = make_pk3(workdir / "a.pk3", {"textures/wall.png": b"old wall"})
+    second = make_pk3(workdir / "b.pk3", {"textures/wall.png": b"new wall", "sprites/impa1.png": b"imp"})
+    third = make_pk3(workdir / "c.pk3", {"textures/wall.jpg": b"jpeg wall"})
+    wad = workdir / "maps.wad"
+    wad.write_bytes(b"PWAD" + bytes(8))
+    files = BundleCache().launch_files([first, second, third, str(wad)])
+    assert files[1:] == [third, str(wad)]
+    assert bundle_contents(files[0]) == {"textures/wall.png": b"new wall", "sprites/impa1.png": b"imp"}
@@ -0,0 +1,56 @@
+import json
+import time
+
+import config_manager
+from config_manager import DEFAULT_CONFIG, ConfigManager
+
+
+def count_writes(monkeypatch):
+    writes = []
+    write = config_manager.atomic_write_json
+
+    def counted(path, data, **kwargs):
+        writes.append(data)
+        write(path, data, **kwargs)
+
+    monkeypatch.setattr(config_manager, "atomic_write_json", counted)
+    return writes
+
+
+def test_stored_settings_override_the_defaults(workdir):
+    (workdir / "config.json").write_text(json.dumps({"gzdoom_path": "/bin/gzdoom", "extra": 1}))
+    config = ConfigManager().config
+    assert config["gzdoom_path"] == "/bin/gzdoom"
+    assert config["extra"] == 1
+    assert config["pk3_files"] == DEFAULT_CONFIG["pk3_files"]
+    (workdir / "config.json").write_text("[]")
+    assert ConfigManager().config == DEFAULT_CONFIG
+
+
+def test_saves_are_coalesced_into_one_write(workdir, monkeypatch):
+    writes = count_writes(monkeypatch)
+    manager = ConfigManager(save_delay=0.2)
+    for number in range(5):
+        manager.config["pk3_files"] = [f"/mods/{number}.pk3"]
+        manager.save_config()
+    assert writes == []
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.3)
+    assert len(writes) == 1
+    assert json.loads((workdir / "config.json").read_text())["pk3_files"] == ["/mods/4.pk3"]
+
+
+def test_flush_writes_pending_changes_at_once(workdir, monkeypatch):
+    writes = count_writes(monkeypatch)
+    manager = ConfigManager(save_delay=60)
+    manager.flush()
+    assert writes == []
+    manager.update_gzdoom_path("/bin/gzdoom")
+    manager.flush()
+    assert len(writes) == 1
+    assert manager.save_timer is None
+    assert json.loads((workdir / "config.json").read_text())["gzdoom_path"] == "/bin/gzdoom"
+    manager.flush()
+    assert len(writes) == 1
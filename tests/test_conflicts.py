@@ -0,0 +1,51 @@
+import struct
+import zipfile
+
+from conflicts import analyze_conflicts, pk3_resource_key, wad_resource_keys
+from wad_reader import WadDirectory
+
+
+def make_directory(names):
+    directory = b"".join(struct.pack("<ii8s", 0, 0, name.encode("ascii")) for name in names)
+    return WadDirectory("test.wad", 0, 0, b"PWAD", directory)
+
+
+def test_pk3_keys_use_short_names_in_namespaces():
+    assert pk3_resource_key("sprites/monsters/POSSA1.png") == "sprites/possa1"
+    assert pk3_resource_key("textures/brickwall_red.png") == "textures/brickwal"
+    assert pk3_resource_key("maps/MAP01.wad") == "maps/map01"
+    assert pk3_resource_key("PLAYPAL.lmp") == "global/playpal"
+    assert pk3_resource_key("models/imp/imp.md3") == "models/imp/imp.md3"
+
+
+def test_pk3_definition_lumps_are_merged():
+    assert pk3_resource_key("DECORATE") is None
+    assert pk3_resource_key("zscript.txt") is None
+    assert pk3_resource_key("decorate/monsters.txt") is None
+
+
+def test_wad_keys_follow_markers_and_maps():
+    directory = make_directory([
+        "PLAYPAL", "MAP01", "THINGS", "LINEDEFS", "S_START", "POSSA1", "S_END",
+        "F_START", "FLOOR0_1", "F_END", "DECORATE", "E1M1", "TEXTMAP", "ENDMAP", "DEMO1"
+    ])
+    assert wad_resource_keys(directory) == [
+        "global/playpal", "maps/map01", "sprites/possa1", "flats/floor0_1", "maps/e1m1", "global/demo1"
+    ]
+
+
+def test_later_mods_shadow_earlier_ones(workdir):
+    first = workdir / "monsters.pk3"
+    with zipfile.ZipFile(first, 'w') as mod:
+        mod.writestr("sprites/POSSA1.png", b"one")
+        mod.writestr("DECORATE", b"actor A {}")
+    second = workdir / "maps.wad"
+    names = [b"MAP01", b"THINGS", b"S_START", b"POSSA1", b"S_END", b"DECORATE"]
+    directory = b"".join(struct.pack("<ii8s", 12, 0, name) for name in names)
+    second.write_bytes(struct.pack("<4sii", b"PWAD", len(names), 12) + directory)
+    missing = workdir / "missing.pk3"
+
+    report = analyze_conflicts([str(first), str(second), str(missing)])
+    assert report.shadows == {(1, 0): ["sprites/possa1"]}
+    assert [path for path, _ in report.errors] == [str(missing)]
+    assert "maps.wad overrides 1 from monsters.pk3 (sprites/possa1)" in report.summary()
@@ -0,0 +1,41 @@
+import io
+import threading
+
+import instance
+
+
+class AnsweringPipe(io.BytesIO):
+    def write(self, data):
+        return len(data)
+
+
+class HungPipe(io.BytesIO):
+    # A window that takes the request and never answers.
+    released = threading.Event()
+
+    def readline(self):
+        self.released.wait()
+        return b""
+
+
+def test_pipe_exchange_gives_up_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(instance, "open", lambda *args, **kwargs: HungPipe(), raising=False)
+    try:
+        assert instance.pipe_exchange("pipe", b"{}\n", 0.1) is None
+    finally:
+        HungPipe.released.set()
+
+
+def test_pipe_exchange_returns_the_reply(monkeypatch):
+    monkeypatch.setattr(instance, "open", lambda *args, **kwargs: AnsweringPipe(b"ok\n"), raising=False)
+    assert instance.pipe_exchange("pipe", b"{}\n", 1) == b"ok\n"
+
+
+def test_pipe_exchange_without_a_window(tmp_path):
+    assert instance.pipe_exchange(str(tmp_path / "missing"), b"{}\n", 1) is None
+
+
+def test_forward_without_a_window(monkeypatch, tmp_path):
+    monkeypatch.setattr(instance, "server_name", lambda: str(tmp_path / "missing"))
+    assert instance.forward(["--preset", "doom2"]) is None
+    assert instance.forward(["--list"]) is None
@@ -0,0 +1,64 @@
+import os
+import zipfile
+
+import launcher
+from launcher import build_command, check_mod_file, validate_launch
+
+
+def test_accepts_archives_and_folders(tmp_path):
+    archive = tmp_path / "mod.pk3"
+    with zipfile.ZipFile(archive, 'w') as mod:
+        mod.writestr("MAPINFO", "map MAP01 {}")
+    folder = tmp_path / "mod_folder.pk3"
+    folder.mkdir()
+    (folder / "MAPINFO").write_text("map MAP01 {}")
+    assert check_mod_file(str(archive)) is None
+    assert check_mod_file(str(folder)) is None
+    assert check_mod_file(str(tmp_path)) is None
+
+
+def test_reports_missing_and_broken_files(tmp_path):
+    broken = tmp_path / "broken.wad"
+    broken.write_bytes(b"ZWAD" + bytes(8))
+    notes = tmp_path / "readme.txt"
+    notes.write_text("no header to check")
+    assert check_mod_file(str(tmp_path / "missing.pk3")) == f"Missing file: {tmp_path / 'missing.pk3'}"
+    assert check_mod_file(str(broken)) == f"Not a valid wad archive: {broken}"
+    assert check_mod_file(str(notes)) is None
+
+
+def test_validate_launch_reports_every_problem(tmp_path):
+    engine = tmp_path / "gzdoom"
+    engine.write_text("#!/bin/sh\n")
+    os.chmod(engine, 0o755)
+    problems = validate_launch(str(engine), [str(tmp_path / "a.pk3"), str(tmp_path), str(tmp_path / "b.wad")])
+    assert problems == [f"Missing file: {tmp_path / 'a.pk3'}", f"Missing file: {tmp_path / 'b.wad'}"]
+    assert validate_launch("", []) == ["GZDoom is not configured."]
+
+
+def test_short_commands_pass_the_mods_directly(workdir):
+    assert build_command("gzdoom", ["/mods/a.pk3", "/mods/b c.wad"]) == ["gzdoom", "-file", "/mods/a.pk3", "/mods/b c.wad"]
+
+
+def test_response_file_lists_the_mods_quoted(workdir):
+    command = build_command("gzdoom", ["/mods/a.pk3", "/mods/b c.wad"], use_response_file=True)
+    assert command[0] == "gzdoom" and command[1].startswith("@")
+    path = command[1][1:]
+    assert os.path.isabs(path)
+    with open(path, 'rb') as response:
+        assert response.read() == b'-file\n"/mods/a.pk3"\n"/mods/b c.wad"\n'
+    # The same mods reuse the same file.
+    assert build_command("gzdoom", ["/mods/a.pk3", "/mods/b c.wad"], use_response_file=True) == command
+    assert build_command("gzdoom", ["/mods/a.pk3"], use_response_file=True) != command
+
+
+def test_long_commands_switch_to_a_response_file(workdir, monkeypatch):
+    monkeypatch.setattr(launcher, "command_limit", lambda: 40)
+    assert build_command("gzdoom", ["/mods/a.pk3"]) == ["gzdoom", "-file", "/mods/a.pk3"]
+    command = build_command("gzdoom", [f"/mods/mod{number}.pk3" for number in range(10)])
+    assert len(command) == 2 and command[1].startswith("@")
+
+
+def test_paths_that_cannot_be_quoted_stay_on_the_command_line(workdir):
+    paths = ['/mods/say "hi".pk3', "/mods/a.pk3"]
+    assert build_command("gzdoom", paths, use_response_file=True) == ["gzdoom", "-file", *paths]
@@ -0,0 +1,29 @@
+from mod_list_model import FilteredModList, ModListModel
+
+
+def test_rows_follow_edits():
+    model = ModListModel(["/a/one.pk3", "/b/two.pk3", "/a/three.wad"])
+    assert model.rows(["/a/three.wad", "/a/one.pk3"]) == [0, 2]
+    model.move_row(0, 2)
+    assert model.rows(["/a/one.pk3"]) == [2]
+    model.remove_rows([1])
+    assert model.rows(["/a/one.pk3", "/a/three.wad", "/x/missing.pk3"]) == [1]
+
+
+def test_rows_of_a_mod_listed_twice():
+    model = ModListModel(["/a/hud.pk3", "/b/maps.wad", "/a/hud.pk3"])
+    assert model.rows(["/a/hud.pk3"]) == [0, 2]
+
+
+def test_filtered_rows_map_back_to_the_mods():
+    model = ModListModel(["/a/one.pk3", "/b/two.pk3", "/a/three.wad"])
+    filtered = FilteredModList(model)
+    filtered.set_rows([0, 2])
+    assert filtered.stringList() == ["one.pk3", "three.wad"]
+    assert filtered.source_row(1) == 2
+    assert filtered.row_of(2) == 1
+    assert filtered.row_of(1) is None
+    filtered.set_rows()
+    assert filtered.rowCount() == 3
+    model.remove_rows([0])
+    assert filtered.stale
@@ -0,0 +1,63 @@
+import os
+import zipfile
+
+import pytest
+
+import pk3_index
+from pk3_index import ArchiveError, Pk3Index, index_cache_file, index_pk3, read_entry, read_pk3_index
+
+
+def make_pk3(path, entries):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data, method in entries:
+            archive.writestr(name, data, compress_type=method)
+    return str(path)
+
+
+def test_reads_entries(workdir):
+    path = make_pk3(workdir / "mod.pk3", [
+        ("textures/", b"", zipfile.ZIP_STORED),
+        ("textures/wall.png", b"stored" * 10, zipfile.ZIP_STORED),
+        ("DECORATE", b"actor Imp2 : DoomImp {}" * 20, zipfile.ZIP_DEFLATED),
+    ])
+    index = read_pk3_index(path)
+    # Directories are skipped.
+    assert index.names() == ["textures/wall.png", "DECORATE"]
+    assert index.find("decorate") == 1
+    assert index.entry_size(0) == 60
+    assert read_entry(index, 0) == b"stored" * 10
+    assert read_entry(index, 1) == b"actor Imp2 : DoomImp {}" * 20
+
+
+def test_index_round_trips_through_bytes(workdir):
+    path = make_pk3(workdir / "mod.pk3", [("MAPINFO", b"map MAP01 {}", zipfile.ZIP_DEFLATED)])
+    index = read_pk3_index(path)
+    copy = Pk3Index.from_bytes(index.to_bytes())
+    assert (copy.path, copy.size, copy.mtime_ns) == (index.path, index.size, index.mtime_ns)
+    assert copy.names() == index.names()
+    assert read_entry(copy, 0) == b"map MAP01 {}"
+
+
+def test_index_pk3_follows_changes(workdir):
+    path = make_pk3(workdir / "mod.pk3", [("MAPINFO", b"old", zipfile.ZIP_STORED)])
+    assert index_pk3(path).names() == ["MAPINFO"]
+    make_pk3(workdir / "mod.pk3", [("MAPINFO", b"new", zipfile.ZIP_STORED), ("ZSCRIPT", b"", zipfile.ZIP_STORED)])
+    assert index_pk3(path).names() == ["MAPINFO", "ZSCRIPT"]
+
+
+def test_index_pk3_reuses_the_cache_file(workdir, monkeypatch):
+    path = make_pk3(workdir / "mod.pk3", [("MAPINFO", b"map MAP01 {}", zipfile.ZIP_STORED)])
+    index = index_pk3(path)
+    assert os.path.exists(index_cache_file(index.path))
+    monkeypatch.setattr(pk3_index, "_indexes", {})
+    monkeypatch.setattr(pk3_index, "read_pk3_index", None)
+    cached = index_pk3(path)
+    assert cached is not index
+    assert cached.names() == ["MAPINFO"]
+
+
+def test_rejects_files_that_are_not_zips(workdir):
+    path = workdir / "broken.pk3"
+    path.write_bytes(b"not a zip archive at all" * 4)
+    with pytest.raises(ArchiveError):
+        read_pk3_index(str(path))
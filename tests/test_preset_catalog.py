@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from preset_catalog import PresetCatalog, legacy_presets
+
+
+@pytest.fixture
+def catalog(workdir):
+    catalog = PresetCatalog(str(workdir / "presets.db"), str(workdir))
+    catalog.save("Brutal", ["/mods/brutal.pk3", "/mods/hud.pk3"])
+    catalog.save("Sigil", ["/mods/sigil.wad", "/mods/hud.pk3"])
+    return catalog
+
+
+def test_delete_removes_the_preset_and_its_mods(catalog):
+    catalog.delete("brutal")
+    assert catalog.preset_names() == ["Sigil"]
+    assert sorted(catalog.mod_paths()) == ["/mods/hud.pk3", "/mods/sigil.wad"]
+    assert catalog.connection.execute("SELECT COUNT(*) FROM preset_mods").fetchone()[0] == 2
+    with pytest.raises(LookupError):
+        catalog.delete("Brutal")
+
+
+def test_rename_keeps_the_mods(catalog):
+    revision = catalog.connection.execute("SELECT revision FROM presets WHERE name = 'Brutal'").fetchone()[0]
+    catalog.rename("Brutal", "Brutal Doom")
+    assert catalog.preset_names() == ["Brutal Doom", "Sigil"]
+    assert catalog.load("brutal doom") == ["/mods/brutal.pk3", "/mods/hud.pk3"]
+    assert catalog.refresh()
+    assert catalog.entries["Brutal Doom"] == revision + 1
+
+
+def test_rename_only_changes_case(catalog):
+    catalog.rename("Brutal", "BRUTAL")
+    assert catalog.preset_names() == ["BRUTAL", "Sigil"]
+
+
+def test_rename_refuses_taken_or_empty_names(catalog):
+    with pytest.raises(ValueError):
+        catalog.rename("Brutal", "sigil")
+    with pytest.raises(ValueError):
+        catalog.rename("Brutal", "")
+    with pytest.raises(LookupError):
+        catalog.rename("Missing", "Other")
+    assert catalog.preset_names() == ["Brutal", "Sigil"]
+
+
+def write_json(path, value):
+    path.write_text(json.dumps(value))
+
+
+def test_legacy_presets_come_from_json_files_and_config(workdir):
+    write_json(workdir / "config.json", {"gzdoom_path": "", "presets": {"Old": ["/mods/old.pk3"], "Broken": "nope"}})
+    write_json(workdir / "necessary.json", ["/not/a/preset.pk3"])
+    write_json(workdir / "Brutal.json", ["/mods/brutal.pk3", "/mods/hud.pk3"])
+    write_json(workdir / "Old.json", ["/mods/newer.pk3"])
+    write_json(workdir / "settings.json", {"not": "a preset"})
+    (workdir / "corrupt.json").write_text("[")
+    assert legacy_presets(str(workdir)) == {
+        "Old": ["/mods/newer.pk3"],
+        "Brutal": ["/mods/brutal.pk3", "/mods/hud.pk3"],
+    }
+
+
+def test_legacy_presets_are_imported_once(workdir):
+    write_json(workdir / "Brutal.json", ["/mods/brutal.pk3", "/mods/hud.pk3"])
+    write_json(workdir / "Sigil.json", [])
+    catalog = PresetCatalog(str(workdir / "presets.db"), str(workdir))
+    assert catalog.preset_names() == ["Brutal", "Sigil"]
+    assert catalog.load("Brutal") == ["/mods/brutal.pk3", "/mods/hud.pk3"]
+    assert catalog.load("Sigil") == []
+    catalog.delete("Brutal")
+    catalog.connection.close()
+
+    reopened = PresetCatalog(str(workdir / "presets.db"), str(workdir))
+    assert reopened.preset_names() == ["Sigil"]
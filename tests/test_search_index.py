@@ -0,0 +1,43 @@
+from search_index import build_index, SearchIndex
+
+
+def make_index(names):
+    return build_index({name: (name, None) for name in names})
+
+
+def test_every_needle_is_verified():
+    index = make_index(["doom2.wad", "doorway.pk3", "zoom.pk3", "doomsday.pk3"])
+    assert sorted(index.search("doom")) == ["doom2.wad", "doomsday.pk3"]
+
+
+def test_all_tokens_must_match():
+    index = make_index(["brutal_doom.pk3", "brutal_heretic.pk3", "doom_hud.pk3"])
+    assert index.search("brutal doom") == ["brutal_doom.pk3"]
+
+
+def test_short_tokens_match_word_starts():
+    index = make_index(["sigil.wad", "ultimate_sigil.wad", "vigil.pk3"])
+    assert sorted(index.search("si")) == ["sigil.wad", "ultimate_sigil.wad"]
+
+
+def test_removed_entries_are_not_returned():
+    index = SearchIndex()
+    index.add("a", "doom2.wad")
+    index.add("b", "doomsday.pk3")
+    index.remove("a")
+    assert index.search("doom") == ["b"]
+
+
+def test_sync_replaces_changed_entries():
+    index = make_index(["doom2.wad"])
+    index.sync({"doom2.wad": ("heretic.wad", None)})
+    assert index.search("doom") == []
+    assert index.search("heretic") == ["doom2.wad"]
+
+
+def test_select_returns_every_match_and_the_best():
+    index = make_index(["doom2.wad", "brutal_doom.pk3", "doomsday.pk3", "zoom.pk3"])
+    keys, best = index.select("doom")
+    assert sorted(keys) == ["brutal_doom.pk3", "doom2.wad", "doomsday.pk3"]
+    assert best == "doom2.wad"
+    assert index.select("  ") == ([], None)
@@ -0,0 +1,31 @@
+from supervisor import EngineRun, EngineSupervisor
+
+
+class ChunkedOutput:
+    # Hands out the engine's output one read at a time, as QProcess does.
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def readAllStandardOutput(self):
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_characters_split_across_reads_are_kept(workdir):
+    supervisor = EngineSupervisor()
+    lines = []
+    supervisor.output_received.connect(lambda run, line: lines.append(line))
+    data = "Cacodémon says héllo\r\nlast line ß".encode("utf-8")
+    split = data.index("é".encode("utf-8")) + 1
+    run = EngineRun("test", ["gzdoom"], ChunkedOutput([data[:split], data[split:-1], data[-1:]]))
+    supervisor.read_output(run)
+    supervisor.read_output(run)
+    supervisor.read_output(run, final=True)
+    assert lines == ["Cacodémon says héllo"]
+    assert run.partial == "last line ß"
+
+
+def test_truncated_output_is_replaced_when_the_run_ends(workdir):
+    supervisor = EngineSupervisor()
+    run = EngineRun("test", ["gzdoom"], ChunkedOutput(["ok é".encode("utf-8")[:-1]]))
+    supervisor.read_output(run, final=True)
+    assert run.partial == "ok �"
@@ -0,0 +1,18 @@
+from themes import THEME_BUNDLE, ThemeBundle, build_bundle
+
+
+def test_committed_bundle_matches_its_sources(tmp_path):
+    # Only the bundle is read at runtime; rebuild it with "python themes.py"
+    # after editing anything under themes/.
+    target = tmp_path / "themes.bundle"
+    build_bundle(target=str(target))
+    with open(THEME_BUNDLE, 'rb') as committed:
+        assert target.read_bytes() == committed.read(), "themes/themes.bundle is out of date; run python themes.py"
+
+
+def test_bundle_holds_both_themes(tmp_path):
+    target = tmp_path / "themes.bundle"
+    build_bundle(target=str(target))
+    bundle = ThemeBundle(str(target))
+    assert {"modern", "classic"} <= set(bundle.themes)
+    assert bundle.theme("classic").stylesheet
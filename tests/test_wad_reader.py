@@ -0,0 +1,46 @@
+import struct
+
+import pytest
+
+from pk3_index import ArchiveError
+from wad_reader import WAD_HEADER, WadFile
+
+
+def make_wad(path, lumps, magic=b"PWAD"):
+    data = b"".join(lump for _, lump in lumps)
+    directory = bytearray()
+    offset = WAD_HEADER.size
+    for name, lump in lumps:
+        directory += struct.pack("<ii8s", offset, len(lump), name)
+        offset += len(lump)
+    path.write_bytes(WAD_HEADER.pack(magic, len(lumps), WAD_HEADER.size + len(data)) + data + bytes(directory))
+    return str(path)
+
+
+def test_reads_lumps(tmp_path):
+    path = make_wad(tmp_path / "maps.wad", [(b"MAP01", b""), (b"things", b"1234"), (b"PLAYPAL", b"\x00" * 8), (b"THINGS", b"5678")])
+    with WadFile(path) as wad:
+        assert not wad.is_iwad
+        assert wad.names() == ["MAP01", "THINGS", "PLAYPAL", "THINGS"]
+        assert wad.entry_size(2) == 8
+        # Later lumps override earlier ones.
+        assert wad.find("things") == 3
+        assert bytes(wad.lump(wad.find("THINGS"))) == b"5678"
+
+
+def test_snapshot_outlives_the_file(tmp_path):
+    path = make_wad(tmp_path / "doom.wad", [(b"PLAYPAL", b"\x00" * 8)], magic=b"IWAD")
+    with WadFile(path) as wad:
+        snapshot = wad.snapshot()
+    assert snapshot.is_iwad
+    assert snapshot.names() == ["PLAYPAL"]
+
+
+def test_rejects_corrupt_directories(tmp_path):
+    path = tmp_path / "broken.wad"
+    path.write_bytes(WAD_HEADER.pack(b"PWAD", 4, 1 << 20))
+    with pytest.raises(ArchiveError):
+        WadFile(str(path))
+    path.write_bytes(b"ZWAD" + bytes(20))
+    with pytest.raises(ArchiveError):
+        WadFile(str(path))
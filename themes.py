@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+
+from PyQt6.QtGui import QImage
+
+from config_manager import get_config_manager
+from storage import atomic_write_bytes
+from tracing import span, traced
+
+THEME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes")
+THEME_SOURCES = os.path.join(THEME_DIR, "themes.json")
+THEME_BUNDLE = os.path.join(THEME_DIR, "themes.bundle")
+DEFAULT_THEME = "modern"
+BUNDLE_MAGIC = b"MOODTHEM"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<8sII")
+IMAGE_ROLES = ("icon", "splash", "background", "button_art")
+
+
+class ThemeError(Exception):
+    pass
+
+
+class Theme:
+    # A view onto one theme of a bundle: every role is a slice of the shared
+    # mapping, so nothing is read until Qt decodes it.
+    def __init__(self, bundle, name, entries):
+        self.bundle = bundle
+        self.name = name
+        self.entries = entries
+
+    def has(self, role):
+        return role in self.entries
+
+    def key(self, role):
+        # Themes sharing a file share its blob, and so its cache entries.
+        return f"{self.bundle.path}:{self.entries[role][0]}"
+
+    def data(self, role):
+        offset, length = self.entries[role]
+        return self.bundle.view[offset:offset + length]
+
+    def image(self, role):
+        return QImage.fromData(self.data(role))
+
+    def images(self):
+        return {role: self.image(role) for role in IMAGE_ROLES if self.has(role)}
+
+    @property
+    def stylesheet(self):
+        return str(self.data("stylesheet"), "utf-8") if self.has("stylesheet") else ""
+
+
+class ThemeBundle:
+    # Layout: an 8-byte magic, the format version and the length of a JSON
+    # table of contents, then the table, then every file back to back.
+    # The table maps each theme's roles to an (offset, length) pair.
+    def __init__(self, path=THEME_BUNDLE):
+        self.path = path
+        with span("theme.map", path=path):
+            with open(path, 'rb') as file:
+                try:
+                    self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    raise ThemeError(f"{path} is empty")
+        self.view = memoryview(self.data)
+        if len(self.data) < BUNDLE_HEADER.size:
+            raise ThemeError(f"{path} is not a theme bundle")
+        magic, version, toc_length = BUNDLE_HEADER.unpack_from(self.data)
+        if magic != BUNDLE_MAGIC:
+            raise ThemeError(f"{path} is not a theme bundle")
+        if version != BUNDLE_VERSION:
+            raise ThemeError(f"{path} uses format {version}, expected {BUNDLE_VERSION}; rebuild it with themes.py")
+        try:
+            self.themes = json.loads(bytes(self.view[BUNDLE_HEADER.size:BUNDLE_HEADER.size + toc_length]))
+        except ValueError:
+            raise ThemeError(f"{path} has a corrupt table of contents")
+        self.cache = {}
+
+    def theme(self, name):
+        if name not in self.themes:
+            raise ThemeError(f"Unknown theme: {name}")
+        if name not in self.cache:
+            self.cache[name] = Theme(self, name, {role: tuple(entry) for role, entry in self.themes[name].items()})
+        return self.cache[name]
+
+
+@traced("theme.build")
+def build_bundle(sources=THEME_SOURCES, target=THEME_BUNDLE):
+    # Each theme lists its files relative to the sources manifest; a file
+    # used by several themes is stored once.
+    with open(sources, 'r') as file:
+        manifest = json.load(file)
+    directory = os.path.dirname(os.path.abspath(sources))
+    blobs = {}
+    toc = {}
+    for name, roles in manifest.items():
+        toc[name] = {}
+        for role, relative_path in roles.items():
+            path = os.path.normpath(os.path.join(directory, relative_path))
+            if path not in blobs:
+                with open(path, 'rb') as file:
+                    blobs[path] = file.read()
+            toc[name][role] = path
+
+    # Offsets depend on the table's length, which depends on the offsets;
+    # placing the files again until the length settles resolves that.
+    toc_data = b""
+    while True:
+        offset = BUNDLE_HEADER.size + len(toc_data)
+        placed = {}
+        for path, blob in blobs.items():
+            placed[path] = [offset, len(blob)]
+            offset += len(blob)
+        resolved = {name: {role: placed[path] for role, path in roles.items()} for name, roles in toc.items()}
+        encoded = json.dumps(resolved, sort_keys=True).encode("utf-8")
+        settled = len(encoded) == len(toc_data)
+        toc_data = encoded
+        if settled:
+            break
+
+    atomic_write_bytes(target, b"".join([BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(toc_data)), toc_data, *blobs.values()]))
+    return resolved
+
+
+_bundle = None
+
+
+def get_theme_bundle():
+    global _bundle
+    if _bundle is None:
+        _bundle = ThemeBundle()
+    return _bundle
+
+
+def get_theme(default=DEFAULT_THEME):
+    # The "theme" setting picks the look; an entry point only supplies the
+    # theme used when none is configured or the configured one is missing.
+    bundle = get_theme_bundle()
+    name = get_config_manager().config.get("theme") or default
+    return bundle.theme(name if name in bundle.themes else default)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the themes into a single bundle.")
+    parser.add_argument("--sources", default=THEME_SOURCES, help="theme manifest to compile")
+    parser.add_argument("--output", default=THEME_BUNDLE, help="bundle to write")
+    args = parser.parse_args(argv)
+    themes = build_bundle(args.sources, args.output)
+    print(f"Wrote {len(themes)} themes to {args.output}: {', '.join(sorted(themes))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
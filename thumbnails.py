@@ -0,0 +1,233 @@
+import os
+import glob
+import struct
+import hashlib
+import threading
+
+from PyQt6.QtGui import QImage, QTransform
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+
+from archives import index_archive, read_archive_entry
+from conflicts import pk3_resource_key
+from pk3_index import ArchiveError
+from storage import cache_path, atomic_write_bytes, atomic_write_json, load_json
+from tracing import span
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_INDEX = "index.json"
+TITLE_LUMPS = ("titlepic", "interpic", "m_doom")
+TITLE_NAMESPACES = ("graphics", "global")
+PATCH_HEADER = struct.Struct("<HHhh")
+PALETTE_SIZE = 768
+MAX_PATCH_SIZE = 4096
+
+
+def find_title_entry(index):
+    if index.kind == "wad":
+        for lump in TITLE_LUMPS:
+            entry = index.find(lump)
+            if entry is not None:
+                return entry
+        return None
+    # pk3 graphics may carry any extension, so entries are matched the way
+    # GZDoom resolves them: by namespace and short lump name.
+    wanted = {namespace + "/" + lump: rank for rank, lump in enumerate(TITLE_LUMPS) for namespace in TITLE_NAMESPACES}
+    best = None
+    for entry, name in enumerate(index.names()):
+        rank = wanted.get(pk3_resource_key(name))
+        if rank is not None and (best is None or rank <= best[0]):
+            best = (rank, entry)
+    return None if best is None else best[1]
+
+
+def find_palette(index):
+    if index.kind == "wad":
+        entry = index.find("PLAYPAL")
+    else:
+        entry = next((entry for entry, name in enumerate(index.names()) if pk3_resource_key(name) == "global/playpal"), None)
+    if entry is None or index.entry_size(entry) < PALETTE_SIZE:
+        return None
+    return parse_palette(read_archive_entry(index, entry))
+
+
+def parse_palette(data):
+    return [0xFF000000 | data[i] << 16 | data[i + 1] << 8 | data[i + 2] for i in range(0, PALETTE_SIZE, 3)]
+
+
+def archive_fingerprint(index, data):
+    # The central directory's CRCs already describe a pk3's contents; a WAD
+    # directory has none, so the lump that was read is hashed along with it.
+    digest = hashlib.blake2b(digest_size=16)
+    if index.kind == "pk3":
+        digest.update(index.name_data)
+        digest.update(index.crcs.tobytes())
+        digest.update(index.sizes.tobytes())
+    else:
+        digest.update(index.directory)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def decode_patch(data, palette):
+    # Doom patches are stored as columns of posts; the pixels are laid out
+    # column-major into an indexed image, which is transposed at the end.
+    width, height, _, _ = PATCH_HEADER.unpack_from(data)
+    if not (0 < width <= MAX_PATCH_SIZE and 0 < height <= MAX_PATCH_SIZE) or len(data) < PATCH_HEADER.size + width * 4:
+        raise ArchiveError("Not a Doom patch")
+    offsets = struct.unpack_from(f"<{width}I", data, PATCH_HEADER.size)
+    pixels = bytearray(width * height)
+    mask = bytearray(width * height)
+    for column, position in enumerate(offsets):
+        base = column * height
+        top = -1
+        while True:
+            if position >= len(data):
+                raise ArchiveError("Truncated Doom patch")
+            delta = data[position]
+            if delta == 0xFF:
+                break
+            # Tall patches store offsets relative to the previous post.
+            top = top + delta if delta <= top else delta
+            length = data[position + 1]
+            run = data[position + 3:position + 3 + length]
+            end = min(top + len(run), height)
+            if end > top:
+                pixels[base + top:base + end] = run[:end - top]
+                mask[base + top:base + end] = b"\xff" * (end - top)
+            position += length + 4
+
+    image = QImage(bytes(pixels), height, width, height, QImage.Format.Format_Indexed8)
+    image.setColorTable(palette or [0xFF000000 | value * 0x010101 for value in range(256)])
+    image = image.convertToFormat(QImage.Format.Format_ARGB32)
+    image.setAlphaChannel(QImage(bytes(mask), height, width, height, QImage.Format.Format_Grayscale8))
+    return image.transformed(QTransform(0, 1, 1, 0, 0, 0))
+
+
+def scale_to_tile(image, width, height):
+    # Fill the tile and crop the overflow around the centre.
+    scaled = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
+    return scaled.copy((scaled.width() - width) // 2, (scaled.height() - height) // 2, width, height)
+
+
+def encode_png(image):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+
+def iwad_palette(directory):
+    # Patch graphics in PWADs rely on the IWAD palette; GZDoom usually sits
+    # next to its IWADs, so the first one found there supplies it.
+    for path in sorted(glob.glob(os.path.join(glob.escape(directory), "*.[wW][aA][dD]"))):
+        try:
+            index = index_archive(path)
+            if index.kind == "wad" and index.is_iwad:
+                palette = find_palette(index)
+                if palette is not None:
+                    return palette
+        except (OSError, ArchiveError):
+            continue
+    return None
+
+
+class ThumbnailCache:
+    # Thumbnails are stored once per archive fingerprint; index.json maps an
+    # archive path, size and mtime to its thumbnail (or to None when it has no
+    # art), so a warm lookup is a stat and a small PNG read.
+    def __init__(self, width, height, palette_directory=None):
+        self.width = width
+        self.height = height
+        self.palette_directory = palette_directory
+        self.palette = None
+        self.palette_loaded = False
+        self.palette_lock = threading.Lock()
+        self.index_file = cache_path(THUMBNAIL_DIR, THUMBNAIL_INDEX)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.entries = load_json(self.index_file, {})
+        self.dirty = False
+
+    def thumbnail_file(self, name):
+        return cache_path(THUMBNAIL_DIR, name)
+
+    def fallback_palette(self):
+        with self.palette_lock:
+            if not self.palette_loaded:
+                self.palette_loaded = True
+                if self.palette_directory:
+                    self.palette = iwad_palette(self.palette_directory)
+            return self.palette
+
+    def thumbnail(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.lock:
+            cached = self.entries.get(path)
+        if cached is not None and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            if cached[2] is None:
+                return None
+            image = QImage(self.thumbnail_file(cached[2]))
+            if not image.isNull():
+                return image
+
+        with span("thumbnail.extract", path=path):
+            image, name, persistent = self.extract(path)
+        if persistent:
+            with self.lock:
+                self.entries[path] = [stat.st_size, stat.st_mtime_ns, name]
+                self.dirty = True
+        return image
+
+    def extract(self, path):
+        index = index_archive(path)
+        entry = find_title_entry(index)
+        if entry is None:
+            return None, None, True
+        data = read_archive_entry(index, entry)
+        name = f"{archive_fingerprint(index, data)}-{self.width}x{self.height}.png"
+        thumbnail_file = self.thumbnail_file(name)
+        if os.path.exists(thumbnail_file):
+            image = QImage(thumbnail_file)
+            if not image.isNull():
+                return image, name, True
+
+        image = QImage.fromData(data)
+        palette_found = True
+        if image.isNull():
+            palette = find_palette(index) or self.fallback_palette()
+            palette_found = palette is not None
+            image = decode_patch(data, palette)
+        image = scale_to_tile(image, self.width, self.height)
+        if not palette_found:
+            # A patch drawn without a palette is only a grey placeholder; it
+            # is not stored so a later run that finds a palette can do better.
+            return image, None, False
+        atomic_write_bytes(thumbnail_file, encode_png(image))
+        return image, name, True
+
+    def preset_thumbnail(self, paths):
+        # Later archives override earlier ones, so the last one with title
+        # art is the one the engine would show.
+        try:
+            for path in reversed(paths):
+                try:
+                    image = self.thumbnail(path)
+                except (OSError, ValueError, ArchiveError, struct.error):
+                    continue
+                if image is not None:
+                    return image
+            return None
+        finally:
+            self.save()
+
+    def save(self):
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                snapshot = dict(self.entries)
+                self.dirty = False
+            atomic_write_json(self.index_file, snapshot)
@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+
+TRACE_ENV = "MOOD_TRACE"
+DEFAULT_TRACE_FILE = "mood_trace.json"
+
+_setting = os.environ.get(TRACE_ENV, "")
+enabled = _setting not in ("", "0")
+trace_file = DEFAULT_TRACE_FILE if _setting in ("1", "true") else _setting
+_events = []
+_thread_names = {}
+_origin = time.perf_counter_ns()
+
+
+def _now_us():
+    return (time.perf_counter_ns() - _origin) / 1000
+
+
+def _register_thread():
+    ident = threading.get_ident()
+    if ident not in _thread_names:
+        _thread_names[ident] = threading.current_thread().name
+    return ident
+
+
+class Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc_info):
+        _events.append({
+            "name": self.name, "cat": "mood", "ph": "X", "ts": self.start, "dur": _now_us() - self.start,
+            "pid": os.getpid(), "tid": _register_thread(), "args": self.args
+        })
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def span(name, **args):
+    if not enabled:
+        return NULL_SPAN
+    return Span(name, args)
+
+
+def mark(name, **args):
+    if enabled:
+        _events.append({"name": name, "cat": "mood", "ph": "i", "s": "p", "ts": _now_us(), "pid": os.getpid(), "tid": _register_thread(), "args": args})
+
+
+def traced(name):
+    # Decorated functions are returned untouched when tracing is off, so the
+    # instrumentation costs nothing in normal runs.
+    def decorator(function):
+        if not enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export(path):
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident, "args": {"name": thread_name}}
+        for ident, thread_name in _thread_names.items()
+    ]
+    with open(path, 'w') as file:
+        json.dump({"traceEvents": metadata + list(_events), "displayTimeUnit": "ms"}, file)
+
+
+def summary():
+    totals = {}
+    for event in list(_events):
+        if event["ph"] != "X":
+            continue
+        count, total, longest = totals.get(event["name"], (0, 0.0, 0.0))
+        totals[event["name"]] = (count + 1, total + event["dur"], max(longest, event["dur"]))
+    lines = [f"{'span':40} {'count':>6} {'total ms':>10} {'mean ms':>10} {'max ms':>10}"]
+    for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name:40} {count:6} {total / 1000:10.2f} {total / count / 1000:10.2f} {longest / 1000:10.2f}")
+    return "\n".join(lines)
+
+
+def finish():
+    export(trace_file)
+    print(summary(), file=sys.stderr)
+    print(f"Trace written to {os.path.abspath(trace_file)}", file=sys.stderr)
+
+
+if enabled:
+    _register_thread()
+    atexit.register(finish)
@@ -0,0 +1,113 @@
+import os
+import sys
+import mmap
+import struct
+from array import array
+
+from pk3_index import ArchiveError
+
+WAD_HEADER = struct.Struct("<4sii")
+WAD_MAGICS = (b"IWAD", b"PWAD")
+LUMP_ENTRY_SIZE = 16
+FIELDS_PER_LUMP = LUMP_ENTRY_SIZE // 4
+
+
+def int_fields(directory):
+    # One unpack for the whole directory: on little-endian hosts this is a
+    # zero-copy cast, otherwise a single array conversion.
+    if sys.byteorder == "little":
+        return directory.cast("i")
+    fields = array("i")
+    fields.frombytes(directory)
+    fields.byteswap()
+    return fields
+
+
+class WadDirectory:
+    kind = "wad"
+
+    def __init__(self, path, size, mtime_ns, magic, directory):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.magic = magic
+        self.directory = memoryview(directory)
+        self.fields = int_fields(self.directory)
+        self.lookup = None
+
+    @property
+    def is_iwad(self):
+        return self.magic == b"IWAD"
+
+    def __len__(self):
+        return len(self.directory) // LUMP_ENTRY_SIZE
+
+    def offset(self, index):
+        return self.fields[index * FIELDS_PER_LUMP]
+
+    def entry_size(self, index):
+        return self.fields[index * FIELDS_PER_LUMP + 1]
+
+    def name(self, index):
+        start = index * LUMP_ENTRY_SIZE + 8
+        raw = self.directory[start:start + 8].tobytes()
+        return raw.split(b"\0", 1)[0].decode("ascii", "replace").upper()
+
+    def names(self):
+        return [self.name(index) for index in range(len(self))]
+
+    def find(self, name):
+        # Later lumps override earlier ones, so the last match wins.
+        if self.lookup is None:
+            self.lookup = {lump_name: index for index, lump_name in enumerate(self.names())}
+        return self.lookup.get(name.upper())
+
+
+class WadFile(WadDirectory):
+    def __init__(self, path):
+        stat = os.stat(path)
+        if stat.st_size < WAD_HEADER.size:
+            raise ArchiveError(f"{path} is too small to be a WAD")
+        self.file = open(path, 'rb')
+        try:
+            self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, directory_offset = WAD_HEADER.unpack_from(self.view)
+            if magic not in WAD_MAGICS:
+                raise ArchiveError(f"{path} is not a WAD file")
+            directory_end = directory_offset + count * LUMP_ENTRY_SIZE
+            if count < 0 or directory_offset < WAD_HEADER.size or directory_end > stat.st_size:
+                raise ArchiveError(f"{path} has a corrupt lump directory")
+            self.data = memoryview(self.view)
+            super().__init__(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, magic, self.data[directory_offset:directory_end])
+        except BaseException:
+            self.file.close()
+            raise
+
+    def lump(self, index):
+        offset = self.offset(index)
+        size = self.entry_size(index)
+        if offset < 0 or size < 0 or offset + size > len(self.data):
+            raise ArchiveError(f"Lump {self.name(index)} lies outside {self.path}")
+        return self.data[offset:offset + size]
+
+    def snapshot(self):
+        return WadDirectory(self.path, self.size, self.mtime_ns, self.magic, self.directory.tobytes())
+
+    def close(self):
+        if isinstance(self.fields, memoryview):
+            self.fields.release()
+        self.directory.release()
+        self.data.release()
+        try:
+            self.view.close()
+        except BufferError:
+            # Lump views handed out to callers are still alive; the mapping is
+            # released once they are garbage collected.
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,59 @@
+import os
+
+from PyQt6.QtCore import QObject, QElapsedTimer, QTimer
+
+from config_manager import get_config_manager
+from preset_catalog import get_catalog
+from shell import register_font_data, register_image
+from tasks import run_in_background
+from tracing import span, traced
+
+SPLASH_MIN_MS = int(os.environ.get("MOOD_SPLASH_MIN_MS", 500))
+
+
+@traced("warmup.assets")
+def load_assets(theme):
+    # The theme is already mapped; decoding its images is the slow part.
+    images = {theme.key(role): image for role, image in theme.images().items()}
+    get_config_manager()
+    get_catalog()
+    return images
+
+
+class StartupSequence(QObject):
+    def __init__(self, splash, create_window, theme, min_display_ms=SPLASH_MIN_MS):
+        super().__init__()
+        self.splash = splash
+        self.create_window = create_window
+        self.theme = theme
+        self.min_display_ms = min_display_ms
+        self.elapsed = QElapsedTimer()
+        self.window = None
+
+    def start(self):
+        self.elapsed.start()
+        run_in_background(
+            load_assets, self.theme,
+            callback=self.assets_loaded, error_callback=self.assets_failed
+        )
+
+    def assets_loaded(self, images):
+        if self.theme.has("font"):
+            register_font_data(self.theme.key("font"), self.theme.data("font"))
+        for key, image in images.items():
+            register_image(key, image)
+        self.build_window()
+
+    def assets_failed(self, error):
+        # Anything that failed to warm up is loaded on demand by the pages.
+        self.build_window()
+
+    def build_window(self):
+        with span("window.build"):
+            self.window = self.create_window(self.theme)
+        remaining = self.min_display_ms - self.elapsed.elapsed()
+        QTimer.singleShot(max(0, remaining), self.show_window)
+
+    def show_window(self):
+        self.window.show()
+        self.splash.close()